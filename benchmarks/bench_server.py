@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+离线基准测试用的本地服务器
+提供合成的 RSS 源、Apple Podcasts / 小宇宙页面和音频文件，
+可设置每个响应的首字节延迟和每个连接的带宽，结果不受外网波动影响
+"""
+
+import asyncio
+import json
+import threading
+from functools import lru_cache
+from typing import Optional
+
+from aiohttp import web
+
+
+# 音频文件内容按 64 KB 的块重复生成，节流时每写一块检查一次速率
+AUDIO_BLOCK = bytes(range(256)) * 256
+
+
+@lru_cache(maxsize=None)
+def make_feed(items: int, base_url: str, audio_size: int) -> bytes:
+    """生成包含 items 集的 RSS 2.0 源，剧集按发布时间倒序排列"""
+    entries = ''.join(
+        f'<item><title>Episode {i}</title>'
+        f'<guid isPermaLink="false">bench-{i}</guid>'
+        f'<pubDate>Mon, {1 + i % 28:02d} Jan 2024 08:00:00 +0000</pubDate>'
+        f'<description>{"Show notes for the benchmark episode. " * 8}</description>'
+        f'<enclosure url="{base_url}/audio/{i}.mp3?size={audio_size}" type="audio/mpeg" length="{audio_size}"/>'
+        f'</item>'
+        for i in range(items, 0, -1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd"><channel>'
+        f'<title>Bench Show</title><link>{base_url}</link>{entries}</channel></rss>'
+    ).encode('utf-8')
+
+
+@lru_cache(maxsize=None)
+def make_apple_page(base_url: str, rss_in_head: bool, body_size: int = 512 * 1024) -> bytes:
+    """
+    生成 Apple Podcasts 风格的页面
+    rss_in_head 为 True 时 RSS 地址放在 og:audio 中，否则只出现在正文末尾的链接里
+    """
+    feed_url = f'{base_url}/feed/100.rss'
+    audio_meta = f'<meta property="og:audio" content="{feed_url}">' if rss_in_head else ''
+    head = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        '<title>Bench Show - Apple Podcasts</title>'
+        '<meta property="og:title" content="Episode 100">'
+        f'{audio_meta}'
+        + '<link rel="stylesheet" href="/assets/app.css">' * 20 +
+        '</head>'
+    )
+    filler = '<div class="episode"><a href="/us/podcast/bench/id1?i=2">Episode</a><p>Description</p></div>'
+    body = filler * (body_size // len(filler))
+    return f'{head}<body>{body}<a href="{feed_url}">RSS</a></body></html>'.encode('utf-8')
+
+
+@lru_cache(maxsize=None)
+def make_xiaoyuzhou_page(eid: str, base_url: str, comments: int = 2000) -> bytes:
+    """生成带 __NEXT_DATA__ 的小宇宙单集页面，pageProps 之外附带大量无关数据"""
+    episode = {
+        'eid': eid,
+        'title': f'Episode {eid}',
+        'podcast': {'title': 'Bench Show'},
+        'enclosure': {'url': f'{base_url}/audio/{eid}.m4a?size=1048576'},
+        'duration': 3600,
+        'description': 'Show notes for the benchmark episode. ' * 50,
+        'pubDate': '2024-01-01T08:00:00.000Z',
+    }
+    data = {
+        'props': {
+            'pageProps': {
+                'episode': episode,
+                'comments': [{'id': i, 'text': 'Comment text ' * 10, 'likes': i} for i in range(comments)],
+            },
+            '__N_SSP': True,
+        },
+        'page': '/episode/[id]',
+        'query': {'id': eid},
+        'buildId': 'bench-build',
+    }
+    script = json.dumps(data, ensure_ascii=False)
+    footer = '<script src="/_next/static/chunks/main.js"></script>' * 200
+    return (
+        '<!DOCTYPE html><html><head><title>Episode</title></head><body><div id="__next"></div>'
+        f'<script id="__NEXT_DATA__" type="application/json">{script}</script>{footer}</body></html>'
+    ).encode('utf-8')
+
+
+class BenchServer:
+    """
+    在后台线程中运行的 aiohttp 服务器
+
+    latency: 每个响应发送首字节前的等待秒数
+    bandwidth: 每个连接的音频传输速率上限（字节/秒），None 表示不限
+    """
+
+    def __init__(self, latency: float = 0.0, bandwidth: Optional[float] = None, port: int = 0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.port = port
+        self.base_url = ''
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'BenchServer':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='bench-server', daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get('/feed/{items:\\d+}.rss', self.feed)
+        app.router.add_get('/apple/{variant}/podcast/bench/id{podcast_id:\\d+}', self.apple_page)
+        app.router.add_get('/xiaoyuzhou/episode/{eid}', self.xiaoyuzhou_page)
+        app.router.add_get('/audio/{name}', self.audio)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f'http://127.0.0.1:{self.port}'
+
+    async def _delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def feed(self, request: web.Request) -> web.Response:
+        await self._delay()
+        audio_size = int(request.query.get('audio_size', 1024 * 1024))
+        body = make_feed(int(request.match_info['items']), self.base_url, audio_size)
+        return web.Response(body=body, content_type='application/rss+xml')
+
+    async def apple_page(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = make_apple_page(self.base_url, request.match_info['variant'] == 'head')
+        return web.Response(body=body, content_type='text/html', charset='utf-8')
+
+    async def xiaoyuzhou_page(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = make_xiaoyuzhou_page(request.match_info['eid'], self.base_url)
+        return web.Response(body=body, content_type='text/html', charset='utf-8')
+
+    async def audio(self, request: web.Request) -> web.StreamResponse:
+        """按 size 参数生成音频数据，支持单个 Range 请求，按 bandwidth 节流"""
+        await self._delay()
+        size = int(request.query.get('size', 1024 * 1024))
+        start, end = 0, size - 1
+        status = 200
+        headers = {'Accept-Ranges': 'bytes', 'Content-Type': 'audio/mpeg'}
+        if request.http_range.start is not None or request.http_range.stop is not None:
+            start = request.http_range.start or 0
+            end = min(size, request.http_range.stop or size) - 1
+            status = 206
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        headers['Content-Length'] = str(end - start + 1)
+
+        response = web.StreamResponse(status=status, headers=headers)
+        await response.prepare(request)
+        loop = asyncio.get_running_loop()
+        began = loop.time()
+        sent = 0
+        position = start
+        while position <= end:
+            offset = position % len(AUDIO_BLOCK)
+            block = AUDIO_BLOCK[offset:offset + end - position + 1]
+            await response.write(block)
+            position += len(block)
+            sent += len(block)
+            if self.bandwidth:
+                ahead = sent / self.bandwidth - (loop.time() - began)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+        await response.write_eof()
+        return response
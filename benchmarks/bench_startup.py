@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+启动耗时基准
+在全新的解释器中用 python -X importtime 导入各命令入口模块，
+汇总导入总耗时和最慢的导入项，并检查不该出现在该路径上的重量级依赖
+
+用法:
+    python benchmarks/bench_startup.py             # 每个入口测 5 次取中位数
+    python benchmarks/bench_startup.py --top 20    # 显示最慢的 20 个导入
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Set
+
+import click
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 入口模块 → 导入时不应加载的模块（只在特定功能中延迟导入）
+ENTRY_POINTS = {
+    'casts_down': ['aiohttp', 'asyncio', 'feedparser', 'bs4', 'tqdm'],
+    'podcast_dl': ['feedparser', 'bs4', 'requests'],
+    'xiaoyuzhou_dl': ['feedparser', 'bs4', 'requests'],
+}
+
+
+def import_times(module: str) -> tuple[int, Dict[str, int], Set[str], float]:
+    """
+    在子进程中导入 module
+    返回: (module 的累计导入耗时 us, {module 直接导入的模块: 累计耗时 us}, 导入的全部模块, 进程总耗时秒)
+    解释器启动时 site 等导入的模块不计入
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    elapsed = time.perf_counter() - started
+
+    # import time: self [us] | cumulative | imported package，子模块先于父模块输出，按缩进表示层级
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative)))
+
+    index = max(i for i, (_, name, _) in enumerate(entries) if name == module)
+    indent, _, total = entries[index]
+    children = {}
+    loaded = set()
+    for depth, name, cumulative in reversed(entries[:index]):
+        if depth <= indent:
+            break
+        loaded.add(name)
+        if depth == indent + 2:
+            children[name] = cumulative
+    return total, children, loaded, elapsed
+
+
+@click.command()
+@click.option('--repeat', type=int, default=5, help='每个入口的测量次数，取中位数（默认 5）')
+@click.option('--top', type=int, default=10, help='显示最慢的 N 个导入（默认 10）')
+def main(repeat: int, top: int):
+    """Report cold-start import times of the command entry points"""
+    failed = False
+    for module, forbidden in ENTRY_POINTS.items():
+        totals, walls = [], []
+        samples: Dict[str, List[int]] = defaultdict(list)
+        for _ in range(repeat):
+            total, children, loaded, elapsed = import_times(module)
+            totals.append(total)
+            walls.append(elapsed)
+            for name, cumulative in children.items():
+                samples[name].append(cumulative)
+
+        click.echo(f"\n[*] import {module}: {statistics.median(totals) / 1000:.1f}ms "
+                   f"(process {statistics.median(walls) * 1000:.0f}ms)")
+        medians = {name: statistics.median(values) for name, values in samples.items()}
+        for name, us in sorted(medians.items(), key=lambda item: -item[1])[:top]:
+            click.echo(f"    {us / 1000:>8.1f}ms  {name}")
+
+        unexpected = [name for name in forbidden if any(m == name or m.startswith(name + '.') for m in loaded)]
+        if unexpected:
+            failed = True
+            click.echo(f"[-] {module} loads {', '.join(unexpected)} at import time")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
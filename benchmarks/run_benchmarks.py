@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+离线基准测试
+对本地服务器测量 RSS 解析、Apple 页面元数据提取、小宇宙页面数据提取和批量下载的耗时，
+并与保存的基线对比，耗时超出容差的用例视为性能回退（退出码 1）
+
+用法:
+    python benchmarks/run_benchmarks.py                 # 运行并与 baseline.json 对比
+    python benchmarks/run_benchmarks.py --quick         # 只跑小规模用例
+    python benchmarks/run_benchmarks.py --save-baseline # 以本次结果作为新基线
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+import click
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_server import BenchServer, make_xiaoyuzhou_page  # noqa: E402
+from casts_progress import ProgressTracker  # noqa: E402
+from podcast_dl import ApplePodcastsParser, PodcastEpisode, RSSParser, create_downloader  # noqa: E402
+from xiaoyuzhou_dl import XiaoyuzhouDownloader  # noqa: E402
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+# 小于该秒数的差异视为计时噪声，不判定为回退
+NOISE_FLOOR = 0.005
+
+
+class Benchmark:
+    """一个基准用例：run() 执行一次被测操作，nbytes 为单次处理的字节数（用于计算吞吐）"""
+
+    def __init__(self, name: str, run: Callable[[], None], nbytes: int = 0):
+        self.name = name
+        self.run = run
+        self.nbytes = nbytes
+
+    def measure(self, repeat: int) -> dict:
+        """
+        预热一次后执行 repeat 次
+        以最短耗时作为结果（受机器上其他负载的影响最小），同时记录中位数
+        """
+        self.run()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            self.run()
+            timings.append(time.perf_counter() - started)
+        seconds = min(timings)
+        result = {'seconds': round(seconds, 6), 'median': round(statistics.median(timings), 6)}
+        if self.nbytes:
+            result['mb_per_s'] = round(self.nbytes / seconds / 1024 / 1024, 1)
+        return result
+
+
+def rss_cases(server: BenchServer, sizes: List[int]) -> List[Benchmark]:
+    """RSSParser.parse：完整解析（feedparser）和只取最新一集（流式解析，读到即停）"""
+    cases = []
+    for items in sizes:
+        url = f'{server.base_url}/feed/{items}.rss'
+
+        def full(url=url, items=items):
+            _, episodes = RSSParser.parse(url)
+            assert len(episodes) == items
+
+        def latest(url=url):
+            _, episodes = RSSParser.parse(url, limit=1)
+            assert len(episodes) == 1
+
+        cases.append(Benchmark(f'rss_parse[items={items}]', full))
+        cases.append(Benchmark(f'rss_parse_latest[items={items}]', latest))
+    return cases
+
+
+def apple_cases(server: BenchServer, pages: int) -> List[Benchmark]:
+    """extract_metadata_async：RSS 地址在 <head> 中（只读头部）和只在正文中（读完整页）"""
+    cases = []
+    for variant in ('head', 'body'):
+        urls = [f'{server.base_url}/apple/{variant}/podcast/bench/id{1000 + i}?i={i}' for i in range(pages)]
+
+        def run(urls=urls):
+            async def fetch_all():
+                async with aiohttp.ClientSession() as session:
+                    for url in urls:
+                        rss_url, title = await ApplePodcastsParser.extract_metadata_async(session, url)
+                        assert rss_url and title
+            asyncio.run(fetch_all())
+
+        cases.append(Benchmark(f'apple_metadata[{variant},pages={pages}]', run))
+    return cases
+
+
+def xiaoyuzhou_cases(server: BenchServer, pages: int) -> List[Benchmark]:
+    """extract_episode_data（已读入的整页）和 get_episode_info（流式读取到 __NEXT_DATA__ 结束）"""
+    downloader = XiaoyuzhouDownloader()
+    html = make_xiaoyuzhou_page('bench', server.base_url).decode('utf-8')
+
+    def extract():
+        for _ in range(pages):
+            assert downloader.extract_episode_data(html)['episode']['eid'] == 'bench'
+
+    urls = [f'{server.base_url}/xiaoyuzhou/episode/ep{i}' for i in range(pages)]
+
+    def fetch():
+        async def fetch_all():
+            async with aiohttp.ClientSession() as session:
+                for url in urls:
+                    assert (await downloader.get_episode_info(session, url))['audio_url']
+        asyncio.run(fetch_all())
+
+    return [
+        Benchmark(f'xiaoyuzhou_extract[pages={pages}]', extract, len(html.encode('utf-8')) * pages),
+        Benchmark(f'xiaoyuzhou_episode_info[pages={pages}]', fetch),
+    ]
+
+
+def download_cases(
+    server: BenchServer,
+    episodes: int,
+    size: int,
+    concurrency: List[int],
+    chunk_sizes: List[int]
+) -> List[Benchmark]:
+    """PodcastDownloader.download_all：并发数 × 读取块大小（KB）"""
+    cases = []
+    for concurrent in concurrency:
+        for chunk_kb in chunk_sizes:
+            def run(concurrent=concurrent, chunk_kb=chunk_kb):
+                params = {'concurrent': concurrent, 'chunk_size': chunk_kb, 'no_manifest': True, 'no_cache': True}
+                downloader = create_downloader(params, progress=ProgressTracker(show_bar=False))
+                batch = [
+                    PodcastEpisode(f'Episode {i}', f'{server.base_url}/audio/{i}.mp3?size={size}', guid=str(i))
+                    for i in range(episodes)
+                ]
+                with tempfile.TemporaryDirectory() as output:
+                    output_dir = Path(output)
+                    # 进度条和逐集结果不是被测内容，输出全部丢弃
+                    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                        asyncio.run(downloader.download_all(batch, 'Bench Show', output_dir))
+                    downloader.close()
+                    files = list(output_dir.iterdir())
+                    assert len(files) == episodes and all(f.stat().st_size == size for f in files)
+
+            cases.append(Benchmark(
+                f'download_all[concurrent={concurrent},chunk={chunk_kb}KB]', run, episodes * size
+            ))
+    return cases
+
+
+def startup_cases() -> List[Benchmark]:
+    """各命令入口模块在全新解释器中的导入耗时（cron 等频繁调用场景的冷启动开销）"""
+    cases = []
+    for module in ('casts_down', 'podcast_dl', 'xiaoyuzhou_dl'):
+        def run(module=module):
+            subprocess.run([sys.executable, '-c', f'import {module}'], cwd=ROOT, check=True)
+
+        cases.append(Benchmark(f'startup[import {module}]', run))
+    return cases
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """打印与基线的对比，返回回退的用例名"""
+    regressions = []
+    width = max(len(name) for name in results)
+    click.echo(f"\n{'Benchmark':<{width}}  {'Best':>10}  {'Baseline':>10}  {'Change':>8}")
+    for name, result in results.items():
+        seconds = result['seconds']
+        throughput = f"  {result['mb_per_s']} MB/s" if 'mb_per_s' in result else ''
+        base = baseline.get(name)
+        if base is None:
+            click.echo(f"{name:<{width}}  {seconds * 1000:>8.1f}ms  {'-':>10}  {'new':>8}{throughput}")
+            continue
+        change = seconds / base['seconds'] - 1 if base['seconds'] else 0.0
+        marker = ''
+        if change > tolerance and seconds - base['seconds'] > NOISE_FLOOR:
+            marker = '  [-] regression'
+            regressions.append(name)
+        elif change < -tolerance:
+            marker = '  [+] faster'
+        click.echo(
+            f"{name:<{width}}  {seconds * 1000:>8.1f}ms  {base['seconds'] * 1000:>8.1f}ms  "
+            f"{change:>+7.0%}{throughput}{marker}"
+        )
+    return regressions
+
+
+@click.command()
+@click.option('--quick', is_flag=True, help='只运行小规模用例')
+@click.option('--repeat', type=int, default=5, help='每个用例的重复次数，取最短耗时（默认 5）')
+@click.option('--filter', 'pattern', default=None, help='只运行名称包含该字符串的用例')
+@click.option('--latency', type=float, default=0.0, help='服务器每个响应的首字节延迟（毫秒，默认 0）')
+@click.option('--bandwidth', type=float, default=None, help='每个连接的带宽上限（MB/s，默认不限）')
+@click.option('--baseline', 'baseline_path', type=click.Path(dir_okay=False, path_type=Path),
+              default=DEFAULT_BASELINE, help='基线文件（默认 benchmarks/baseline.json）')
+@click.option('--save-baseline', is_flag=True, help='将本次结果写入基线文件')
+@click.option('--tolerance', type=float, default=0.25, help='允许的耗时增长比例（默认 0.25）')
+@click.option('--json-output', type=click.Path(dir_okay=False, path_type=Path), help='将结果写入 JSON 文件')
+def main(quick: bool, repeat: int, pattern: Optional[str], latency: float, bandwidth: Optional[float],
+         baseline_path: Path, save_baseline: bool, tolerance: float, json_output: Optional[Path]):
+    """Run the offline benchmark suite against a local server"""
+    settings = {'quick': quick, 'latency_ms': latency, 'bandwidth_mb_s': bandwidth}
+    server = BenchServer(latency=latency / 1000, bandwidth=bandwidth * 1024 * 1024 if bandwidth else None)
+
+    with server:
+        if quick:
+            cases = (
+                rss_cases(server, [10, 1000])
+                + apple_cases(server, 5)
+                + xiaoyuzhou_cases(server, 5)
+                + download_cases(server, 4, 2 * 1024 * 1024, [1, 4], [64])
+                + startup_cases()
+            )
+        else:
+            cases = (
+                rss_cases(server, [10, 100, 1000, 10000])
+                + apple_cases(server, 20)
+                + xiaoyuzhou_cases(server, 20)
+                + download_cases(server, 8, 4 * 1024 * 1024, [1, 4, 8], [16, 64, 256])
+                + startup_cases()
+            )
+        if pattern:
+            cases = [case for case in cases if pattern in case.name]
+
+        click.echo(f"[*] Running {len(cases)} benchmark(s) against {server.base_url} (repeat {repeat})")
+        results = {}
+        for case in cases:
+            results[case.name] = case.measure(repeat)
+            click.echo(f"[+] {case.name}: {results[case.name]['seconds'] * 1000:.1f}ms")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': settings,
+        'results': results,
+    }
+    if json_output:
+        json_output.write_text(json.dumps(report, indent=2) + '\n')
+
+    baseline = {}
+    if baseline_path.exists():
+        stored = json.loads(baseline_path.read_text())
+        if stored.get('settings') != settings:
+            click.echo(f"[!] Baseline was recorded with different settings: {stored.get('settings')}")
+        baseline = stored.get('results', {})
+    regressions = compare(results, baseline, tolerance)
+
+    if save_baseline:
+        if pattern and baseline:
+            # 只运行了部分用例时保留其他用例的基线
+            report['results'] = {**baseline, **results}
+        baseline_path.write_text(json.dumps(report, indent=2) + '\n')
+        click.echo(f"\n[+] Baseline saved: {baseline_path}")
+    elif regressions:
+        click.echo(f"\n[-] {len(regressions)} benchmark(s) slower than baseline by more than {tolerance:.0%}")
+        sys.exit(1)
+    elif baseline:
+        click.echo("\n[+] No regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,13 @@ from pathlib import Path
 import click
 
 
+# 程序用不到的标准库和第三方模块，不打进可执行文件（单文件模式每次启动都要解压全部内容）
+EXCLUDED_MODULES = [
+    'tkinter', 'unittest', 'doctest', 'pydoc', 'pdb', 'lib2to3', 'xmlrpc', 'test',
+    'requests', 'urllib3', 'IPython', 'numpy',
+]
+
+
 def get_platform_info():
     """获取当前平台信息"""
     system = platform.system().lower()
@@ -64,16 +71,28 @@ def clean_build():
     click.echo("✓ 清理完成\n")
 
 
-def build_executable():
-    """使用 PyInstaller 构建可执行文件"""
+def build_executable(onedir: bool = False):
+    """
+    使用 PyInstaller 构建可执行文件
+    有 casts_down.spec 时按其配置构建，否则按入口脚本直接构建并排除 EXCLUDED_MODULES；
+    onedir 构建为目录，启动时无需先解压到临时目录，适合频繁调用的场景
+    """
     click.echo("🔨 开始构建可执行文件...\n")
 
     # 运行 PyInstaller
-    cmd = [
-        'pyinstaller',
-        '--clean',
-        'casts_down.spec'
-    ]
+    if Path('casts_down.spec').exists():
+        cmd = ['pyinstaller', '--clean', 'casts_down.spec']
+    else:
+        cmd = [
+            'pyinstaller',
+            '--clean',
+            '--noconfirm',
+            '--onedir' if onedir else '--onefile',
+            '--name', 'casts-down',
+        ]
+        for module in EXCLUDED_MODULES:
+            cmd += ['--exclude-module', module]
+        cmd.append('casts_down.py')
 
     click.echo(f"执行命令: {' '.join(cmd)}\n")
 
@@ -86,8 +105,8 @@ def build_executable():
     click.echo("\n✓ 构建完成")
 
 
-def create_release_package():
-    """创建发布包"""
+def create_release_package(onedir: bool = False):
+    """创建发布包（目录模式打包为 zip）"""
     os_name, arch = get_platform_info()
 
     click.echo(f"\n📦 创建发布包 ({os_name}-{arch})...\n")
@@ -104,6 +123,8 @@ def create_release_package():
         executable_name += '.exe'
 
     executable_path = dist_dir / executable_name
+    if onedir:
+        executable_path = dist_dir / 'casts-down' / executable_name
 
     if not executable_path.exists():
         click.echo(f"❌ 找不到可执行文件: {executable_path}", err=True)
@@ -115,6 +136,14 @@ def create_release_package():
 
     # 复制可执行文件到 release 目录，带平台标识
     release_name = f'casts-down-{os_name}-{arch}'
+    if onedir:
+        archive = shutil.make_archive(str(release_dir / release_name), 'zip', dist_dir, 'casts-down')
+        release_path = Path(archive)
+        click.echo(f"✓ 发布包: {release_path}")
+        click.echo(f"  大小: {release_path.stat().st_size / (1024 * 1024):.2f} MB")
+        click.echo(f"  平台: {os_name}-{arch}")
+        return release_path
+
     if os_name == 'windows':
         release_name += '.exe'
 
@@ -134,7 +163,8 @@ def create_release_package():
 @click.command()
 @click.option('--clean', is_flag=True, help='仅清理构建目录')
 @click.option('--no-clean', is_flag=True, help='构建前不清理')
-def main(clean, no_clean):
+@click.option('--onedir', is_flag=True, help='构建为目录而非单文件（启动更快，无需每次解压）')
+def main(clean, no_clean, onedir):
     """
     Casts Down 打包工具
 
@@ -145,6 +175,10 @@ def main(clean, no_clean):
     \b
     仅清理构建目录:
       python build.py --clean
+
+    \b
+    构建为目录（启动更快）:
+      python build.py --onedir
     """
 
     click.echo("=" * 60)
@@ -171,10 +205,10 @@ def main(clean, no_clean):
         clean_build()
 
     # 构建可执行文件
-    build_executable()
+    build_executable(onedir)
 
     # 创建发布包
-    release_path = create_release_package()
+    release_path = create_release_package(onedir)
 
     click.echo()
     click.echo("=" * 60)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+磁盘缓存
+- FeedCache: RSS 源条件请求缓存（ETag/Last-Modified + 解析结果）
+- MetadataCache: 带 TTL 的元数据键值缓存
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import brotli  # 可选依赖，安装后 aiohttp 可以解码 br 压缩的响应
+except ImportError:
+    brotli = None
+
+
+# 请求 RSS 时声明可接受的压缩编码
+ACCEPT_ENCODING = 'gzip, deflate, br' if brotli else 'gzip, deflate'
+
+
+def default_cache_dir() -> Path:
+    """默认缓存目录：$XDG_CACHE_HOME/casts_down 或 ~/.cache/casts_down"""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'casts_down'
+
+
+def _write_atomic(path: Path, data: bytes):
+    """先写临时文件再替换，避免并发运行读到半个文件"""
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+class FeedCache:
+    """
+    RSS 源缓存，以 URL 为键
+
+    每个源保存一份 <key>.json：URL、ETag、Last-Modified、抓取时间和解析结果。
+    命中 304 时直接复用解析结果，无需重新下载和解析；原始正文不保存
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.root = Path(cache_dir or default_cache_dir()) / 'feeds'
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        """返回 (条目路径, 旧版本保存的压缩正文路径)"""
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.xml.gz"
+
+    def get(self, url: str) -> Optional[dict]:
+        """读取缓存条目，不存在或已损坏时返回 None"""
+        meta_path, _ = self._paths(url)
+        try:
+            entry = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('url') == url else None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[dict]) -> dict:
+        """根据缓存条目生成 If-None-Match / If-Modified-Since 请求头"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, headers, parsed):
+        """保存响应的校验值和解析结果；缓存失败不影响下载"""
+        if not headers.get('ETag') and not headers.get('Last-Modified'):
+            return  # 无法发起条件请求，缓存没有意义
+
+        meta_path, body_path = self._paths(url)
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+            'parsed': parsed,
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            if body_path.exists():
+                body_path.unlink()  # 旧版本保存的正文已不再使用
+            _write_atomic(meta_path, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        except OSError:
+            pass
+
+    def touch(self, url: str, entry: dict):
+        """304 后刷新抓取时间"""
+        meta_path, _ = self._paths(url)
+        entry['fetched_at'] = time.time()
+        try:
+            _write_atomic(meta_path, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        except OSError:
+            pass
+
+
+class MetadataCache:
+    """
+    小型元数据缓存（SQLite 键值表），按命名空间存放 JSON 值，带 TTL
+
+    用于 Apple 单集 ID → 音频地址、播客 ID → RSS 地址等很少变化、
+    但每次查询都要一次网络往返的映射。
+    条目数超过 max_entries 时先清理过期条目，再按过期时间从早到晚（即写入先后）淘汰
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            namespace  TEXT NOT NULL,
+            key        TEXT NOT NULL,
+            value      TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: float = 7 * 86400, max_entries: int = 50000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        root = Path(cache_dir or default_cache_dir())
+        try:
+            root.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(root / 'metadata.sqlite'), timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(self.SCHEMA)
+        except (OSError, sqlite3.Error):
+            self._conn = None  # 缓存不可用时退化为不缓存
+
+    def get(self, namespace: str, key: str):
+        """读取未过期的值，不存在时返回 None"""
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value, ttl: Optional[float] = None):
+        """写入值（覆盖旧值）"""
+        self.set_many(namespace, {key: value}, ttl)
+
+    def set_many(self, namespace: str, values: dict, ttl: Optional[float] = None):
+        """在一个事务中批量写入"""
+        if self._conn is None or not values:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    [(namespace, key, json.dumps(value, ensure_ascii=False), expires_at)
+                     for key, value in values.items()]
+                )
+                self._evict()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self):
+        """在写入事务中控制缓存大小：超过上限时淘汰到上限的 90%"""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count <= self.max_entries:
+            return
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        excess = count - int(self.max_entries * 0.9)
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE (namespace, key) IN "
+                "(SELECT namespace, key FROM entries ORDER BY expires_at LIMIT ?)",
+                (excess,)
+            )
+
+    def delete(self, namespace: str, key: str):
+        """使单个条目失效"""
+        if self._conn is None:
+            return
+        with self._conn:
+            self._conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -4,11 +4,15 @@ Casts Down - 统一播客下载工具
 自动识别 URL 类型并调用对应的下载器
 """
 
+import re
 import sys
+from typing import List
 from urllib.parse import urlparse
 
 import click
 
+from casts_urls import read_opml, read_url_file
+
 
 def detect_downloader(url: str) -> str:
     """
@@ -46,13 +50,244 @@ def print_disclaimer():
     click.echo(disclaimer)
 
 
+URL_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*://')
+
+
+def split_arguments(args: List[str]) -> tuple[List[str], List[str]]:
+    """
+    把位置参数拆分为 URL 和透传给下载器的选项
+    第一个参数总是视为 URL（兼容本地 RSS 路径），之后只有带协议头的才算 URL
+    """
+    urls, options = [], []
+    for index, arg in enumerate(args):
+        if (index == 0 and not arg.startswith('-')) or URL_PATTERN.match(arg):
+            urls.append(arg)
+        else:
+            options.append(arg)
+    return urls, options
+
+
+def run_single(url: str, options: List[str]):
+    """单个 URL：交给对应下载器的命令行入口"""
+    downloader_type = detect_downloader(url)
+
+    click.echo(f"[*] Detected: ", nl=False)
+
+    if downloader_type == 'xiaoyuzhou':
+        click.echo("Xiaoyuzhou Podcast\n")
+        from xiaoyuzhou_dl import main as xiaoyuzhou_main
+
+        # 重新构建参数列表
+        sys.argv = ['xiaoyuzhou-dl', url] + options
+
+        try:
+            xiaoyuzhou_main(standalone_mode=False)
+        except SystemExit:
+            pass
+
+    else:  # podcast
+        if 'podcasts.apple.com' in url:
+            click.echo("Apple Podcasts\n")
+        elif url.endswith(('.rss', '.xml')):
+            click.echo("RSS Feed\n")
+        else:
+            click.echo("Podcast RSS Feed\n")
+
+        from podcast_dl import main as podcast_main
+
+        # 重新构建参数列表
+        sys.argv = ['podcast-dl', url] + options
+
+        try:
+            podcast_main(standalone_mode=False)
+        except SystemExit:
+            pass
+
+
+def parse_options(options: List[str]) -> tuple[dict, dict]:
+    """
+    用各下载器自己的命令行定义解析透传选项，忽略对方独有的选项
+    返回: ({'podcast': 模块, 'xiaoyuzhou': 模块}, {'podcast': 参数字典, 'xiaoyuzhou': 参数字典})
+    """
+    import podcast_dl
+    import xiaoyuzhou_dl
+
+    modules = {'podcast': podcast_dl, 'xiaoyuzhou': xiaoyuzhou_dl}
+    params = {
+        name: module.main.make_context(
+            f'{name}-dl', ['-'] + options,
+            ignore_unknown_options=True, allow_extra_args=True
+        ).params
+        for name, module in modules.items()
+    }
+    return modules, params
+
+
+def shared_resources(params: dict) -> tuple:
+    """按播客下载器的参数创建各源共用的连接配置和字节进度，返回 (ConnectionConfig, ProgressTracker)"""
+    from casts_net import ConnectionConfig
+    from casts_progress import ProgressTracker
+
+    try:
+        connection = ConnectionConfig.from_params(params)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--net-config')
+    try:
+        progress = ProgressTracker.from_params(params)  # 所有源共用一条字节进度
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--progress-fd')
+    return connection, progress
+
+
+def run_batch(urls: List[str], options: List[str]) -> int:
+    """
+    多个 URL：在同一个进程、同一个事件循环和同一个 session 中解析并下载
+    所有下载共享一个全局并发额度，返回失败的源数量
+    """
+    import asyncio
+
+    import podcast_dl
+    import xiaoyuzhou_dl
+    from casts_profile import profiling
+    from casts_ratelimit import BandwidthLimiter
+    from casts_retry import RetryPolicy
+    from casts_scheduler import HostScheduler
+
+    modules, params = parse_options(options)
+    concurrent = params['podcast']['concurrent']
+    connection, progress = shared_resources(params['podcast'])
+
+    async def run():
+        scheduler = HostScheduler(concurrent)  # 全局下载并发上限，按主机自适应分配
+        resolve_semaphore = asyncio.Semaphore(concurrent)  # 同时解析的源数量
+        retry = RetryPolicy.from_params(params['podcast'])  # 所有源共享一个重试预算
+        limiter = BandwidthLimiter.from_params(params['podcast'])  # 全局限速由所有源共享
+        downloaders = {
+            name: module.create_downloader(params[name], scheduler, retry, progress, limiter)
+            for name, module in modules.items()
+        }
+
+        async def process(session, url):
+            name = detect_downloader(url)
+            async with resolve_semaphore:
+                try:
+                    return await modules[name].run_url(session, downloaders[name], url, params[name])
+                except Exception as e:
+                    click.echo(f"[-] {url}: {e}", err=True)
+                    return False
+
+        # 小宇宙单集链接合并为一条流水线：并发解析，解析完即开始下载
+        episode_urls = [url for url in urls if detect_downloader(url) == 'xiaoyuzhou' and '/episode/' in url]
+        batched = set(episode_urls)
+        sources = [url for url in urls if url not in batched]
+
+        async def process_episodes(session):
+            if not episode_urls:
+                return []
+            return await xiaoyuzhou_dl.run_episode_urls(
+                session, downloaders['xiaoyuzhou'], episode_urls, params['xiaoyuzhou']
+            )
+
+        try:
+            async with connection.create_session() as session:
+                # Apple 播客主页的 RSS 地址批量 lookup，逐个解析时命中缓存
+                resolved = await podcast_dl.prefetch_apple_feeds(
+                    session, sources, downloaders['podcast'].metadata_cache
+                )
+                if resolved:
+                    click.echo(f"[*] Resolved {resolved} Apple Podcasts feed(s) via bulk lookup\n")
+
+                episode_results, *source_results = await asyncio.gather(
+                    process_episodes(session),
+                    *(process(session, url) for url in sources)
+                )
+        finally:
+            for downloader in downloaders.values():
+                downloader.close()
+        return source_results + episode_results
+
+    with profiling(params['podcast']):
+        results = asyncio.run(run())
+    failed = sum(1 for ok in results if not ok)
+    click.echo(f"\nBatch complete: {len(results) - failed}/{len(results)} sources succeeded")
+    return failed
+
+
+def run_watch(urls: List[str], options: List[str], poll_min: float, poll_max: float):
+    """
+    订阅监视：常驻进程按各订阅的发布频率轮询，新剧集直接下载（见 casts_watch）
+    所有轮询和下载共用一个持久 session、一个全局并发额度，已下载的剧集总是跳过
+    """
+    import asyncio
+    import signal
+
+    from casts_ratelimit import BandwidthLimiter
+    from casts_retry import RetryPolicy
+    from casts_scheduler import HostScheduler
+    from casts_watch import FeedWatcher
+
+    # 单集链接没有可轮询的剧集列表
+    sources = []
+    for url in urls:
+        if '/episode/' in url or 'i=' in urlparse(url).query:
+            click.echo(f"[!] Skipping episode link in watch mode: {url}", err=True)
+        else:
+            sources.append(url)
+    if not sources:
+        raise click.UsageError("--watch 需要播客主页或 RSS 地址")
+
+    modules, params = parse_options(options)
+    for name in params:
+        params[name]['skip_existing'] = True
+    connection, progress = shared_resources(params['podcast'])
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, task.cancel)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            pass  # Windows 不支持，只能 Ctrl+C 退出
+
+        scheduler = HostScheduler(params['podcast']['concurrent'])
+        # 常驻进程不设总重试预算，每个文件仍按 --retries 重试
+        retry = RetryPolicy(retries=params['podcast'].get('retries', 3), budget=None)
+        limiter = BandwidthLimiter.from_params(params['podcast'])
+        downloaders = {
+            name: module.create_downloader(params[name], scheduler, retry, progress, limiter)
+            for name, module in modules.items()
+        }
+        watcher = FeedWatcher(
+            sources, downloaders, params, poll_min * 60, poll_max * 60, detect=detect_downloader
+        )
+        try:
+            async with connection.create_session() as session:
+                await watcher.run(session)
+        except asyncio.CancelledError:
+            click.echo("\n[*] Watch stopped")
+        finally:
+            for downloader in downloaders.values():
+                downloader.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        click.echo("\n[*] Watch stopped")
+
+
 @click.command(context_settings=dict(
     ignore_unknown_options=True,
     allow_extra_args=True,
 ))
-@click.argument('url')
-@click.pass_context
-def main(ctx, url: str):
+@click.argument('args', nargs=-1, type=click.UNPROCESSED)
+@click.option('--input-file', '-i', 'input_files', type=click.Path(exists=True, dir_okay=False), multiple=True,
+              help='URL 列表文件，每行一个（可重复）')
+@click.option('--opml', 'opml_files', type=click.Path(exists=True, dir_okay=False), multiple=True,
+              help='OPML 订阅导出文件（可重复）')
+@click.option('--watch', is_flag=True, help='常驻监视订阅，按各自的发布频率轮询并下载新剧集')
+@click.option('--poll-min', type=click.FloatRange(min=1), default=15, help='--watch 最短轮询间隔（分钟，默认 15）')
+@click.option('--poll-max', type=click.FloatRange(min=1), default=1440, help='--watch 最长轮询间隔（分钟，默认 1440）')
+def main(args: tuple, input_files: tuple, opml_files: tuple, watch: bool, poll_min: float, poll_max: float):
     """
     Casts Down - 智能播客下载工具
 
@@ -84,45 +319,44 @@ def main(ctx, url: str):
     \b
     # RSS 源
     casts-down "https://feeds.example.com/podcast.rss" --all
+
+    \b
+    # 批量：多个 URL、URL 列表文件或 OPML 订阅导出
+    casts-down URL1 URL2 --latest 1
+    casts-down -i urls.txt --opml subscriptions.opml -c 8
+
+    \b
+    # 常驻监视订阅，有新剧集时自动下载
+    casts-down --watch --opml subscriptions.opml
     """
 
     # 打印横幅和免责声明
     print_banner()
     print_disclaimer()
 
-    downloader_type = detect_downloader(url)
-
-    click.echo(f"[*] Detected: ", nl=False)
-
-    if downloader_type == 'xiaoyuzhou':
-        click.echo("Xiaoyuzhou Podcast\n")
-        from xiaoyuzhou_dl import main as xiaoyuzhou_main
-
-        # 重新构建参数列表
-        sys.argv = ['xiaoyuzhou-dl', url] + ctx.args
+    urls, options = split_arguments(list(args))
+    for path in input_files:
+        urls.extend(read_url_file(path))
+    for path in opml_files:
+        urls.extend(read_opml(path))
 
-        try:
-            xiaoyuzhou_main(standalone_mode=False)
-        except SystemExit:
-            pass
+    # 去重并保持顺序
+    urls = list(dict.fromkeys(urls))
 
-    else:  # podcast
-        if 'podcasts.apple.com' in url:
-            click.echo("Apple Podcasts\n")
-        elif url.endswith(('.rss', '.xml')):
-            click.echo("RSS Feed\n")
-        else:
-            click.echo("Podcast RSS Feed\n")
+    if not urls:
+        raise click.UsageError("请提供至少一个 URL、--input-file 或 --opml")
 
-        from podcast_dl import main as podcast_main
+    if watch:
+        run_watch(urls, options, poll_min, poll_max)
+        return
 
-        # 重新构建参数列表
-        sys.argv = ['podcast-dl', url] + ctx.args
+    if len(urls) == 1 and not input_files and not opml_files:
+        run_single(urls[0], options)
+        return
 
-        try:
-            podcast_main(standalone_mode=False)
-        except SystemExit:
-            pass
+    click.echo(f"[*] Batch mode: {len(urls)} source(s)\n")
+    if run_batch(urls, options):
+        sys.exit(1)
 
 
 if __name__ == '__main__':
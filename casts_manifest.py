@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+下载清单
+podcast_dl 和 xiaoyuzhou_dl 共用的 SQLite 下载记录，用于 --skip-existing 判断
+"""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+
+def default_manifest_path() -> Path:
+    """默认清单路径：$XDG_DATA_HOME/casts_down/manifest.sqlite 或 ~/.local/share/casts_down/manifest.sqlite"""
+    base = os.environ.get('XDG_DATA_HOME') or Path.home() / '.local' / 'share'
+    return Path(base) / 'casts_down' / 'manifest.sqlite'
+
+
+class DownloadManifest:
+    """
+    已完成下载的清单，以 (播客, GUID) 和音频 URL 建索引
+
+    跳过判断只做一次索引查询，不依赖由标题生成的文件名，
+    因此改名的剧集不会被重复下载，未完成的 .tmp 也不会被当作已完成
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS downloads (
+            podcast       TEXT NOT NULL,
+            guid          TEXT NOT NULL,
+            enclosure_url TEXT NOT NULL,
+            size          INTEGER NOT NULL,
+            completed_at  REAL NOT NULL,
+            path          TEXT NOT NULL,
+            PRIMARY KEY (podcast, guid)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS downloads_enclosure_url ON downloads (enclosure_url);
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or default_manifest_path())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        # WAL 允许多个进程同时读写（例如多个 cron 任务并行）
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+
+    def find(self, podcast: str, guid: Optional[str], enclosure_url: str) -> Optional[dict]:
+        """按 (播客, GUID) 或音频 URL 查找下载记录"""
+        row = self._conn.execute(
+            "SELECT podcast, guid, enclosure_url, size, completed_at, path FROM downloads "
+            "WHERE (podcast = ? AND guid = ?) OR enclosure_url = ? LIMIT 1",
+            (podcast, guid or enclosure_url, enclosure_url)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('podcast', 'guid', 'enclosure_url', 'size', 'completed_at', 'path')
+        return dict(zip(keys, row))
+
+    def is_downloaded(self, podcast: str, guid: Optional[str], enclosure_url: str, output_path: Path) -> bool:
+        """
+        跳过判断：清单记录的文件仍然存在（大小一致）、且在本次的输出目录中才视为已下载
+        （剧集改名后文件名不同也能命中；文件被删除或换了 -o 目录时重新下载）
+        清单之前已存在的非空文件（旧版本下载）会被补录，之后同样走索引查询
+        """
+        entry = self.find(podcast, guid, enclosure_url)
+        if entry:
+            recorded = Path(entry['path'])
+            if (recorded.parent == output_path.parent.resolve() and recorded.is_file()
+                    and recorded.stat().st_size == entry['size']):
+                return True
+        if output_path.is_file() and output_path.stat().st_size > 0:
+            self.record(podcast, guid, enclosure_url, output_path)
+            return True
+        return False
+
+    def record(self, podcast: str, guid: Optional[str], enclosure_url: str, path: Path, size: Optional[int] = None):
+        """记录一次完成的下载（同一剧集重复下载时覆盖旧记录）"""
+        if size is None:
+            size = path.stat().st_size
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads (podcast, guid, enclosure_url, size, completed_at, path) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (podcast, guid or enclosure_url, enclosure_url, size, time.time(), str(path.resolve()))
+            )
+
+    def close(self):
+        self._conn.close()
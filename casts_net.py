@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+连接池配置
+podcast_dl 和 xiaoyuzhou_dl 共用的 aiohttp 连接器设置：
+连接数上限、DNS 缓存、keep-alive 和 Happy Eyeballs
+"""
+
+import inspect
+import json
+from pathlib import Path
+from typing import Optional
+
+import aiohttp
+import click
+
+import casts_profile
+
+
+class ConnectionConfig:
+    """
+    aiohttp TCPConnector 的可调参数
+
+    一次运行只创建一个连接器，元数据请求和音频下载共用，
+    向少数几个 CDN 主机并发请求时可以复用连接、避免重复 DNS 解析
+    """
+
+    # 配置文件 / 命令行参数名 -> 属性名
+    FIELDS = {
+        'conn_limit': 'limit',
+        'conn_per_host': 'limit_per_host',
+        'dns_ttl': 'dns_ttl',
+        'keepalive': 'keepalive_timeout',
+        'happy_eyeballs_delay': 'happy_eyeballs_delay',
+    }
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        dns_ttl: Optional[int] = 300,
+        keepalive_timeout: float = 30.0,
+        happy_eyeballs_delay: Optional[float] = 0.25
+    ):
+        self.limit = limit                      # 总连接数上限，0 表示不限
+        self.limit_per_host = limit_per_host    # 单主机连接数上限，0 表示不限
+        self.dns_ttl = dns_ttl                  # DNS 缓存秒数，None 表示永久缓存
+        self.keepalive_timeout = keepalive_timeout
+        self.happy_eyeballs_delay = happy_eyeballs_delay  # None 表示关闭 Happy Eyeballs
+
+    @classmethod
+    def from_params(cls, params: dict) -> 'ConnectionConfig':
+        """
+        由命令行参数构建：默认值 < --net-config 配置文件 < 单独的命令行参数
+        """
+        config = cls()
+        if params.get('net_config'):
+            try:
+                data = json.loads(Path(params['net_config']).read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                raise ValueError(f"无法读取连接配置文件 {params['net_config']}: {e}")
+            config.update(data)
+        config.update({key: params.get(key) for key in cls.FIELDS if params.get(key) is not None})
+        return config
+
+    def update(self, values: dict):
+        """按 FIELDS 中的键覆盖配置，未知键报错以免拼写错误被静默忽略"""
+        for key, value in values.items():
+            if key not in self.FIELDS:
+                raise ValueError(f"未知的连接配置项: {key}")
+            if key == 'happy_eyeballs_delay' and value is not None and value <= 0:
+                value = None
+            setattr(self, self.FIELDS[key], value)
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """创建连接器（必须在事件循环中调用）"""
+        kwargs = {
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'use_dns_cache': True,
+            'ttl_dns_cache': self.dns_ttl,
+            'keepalive_timeout': self.keepalive_timeout,
+        }
+        # happy_eyeballs_delay 需要 aiohttp >= 3.10
+        if 'happy_eyeballs_delay' in inspect.signature(aiohttp.TCPConnector).parameters:
+            kwargs['happy_eyeballs_delay'] = self.happy_eyeballs_delay
+        return aiohttp.TCPConnector(**kwargs)
+
+    def create_session(self, **kwargs) -> aiohttp.ClientSession:
+        """创建使用该连接器的会话；开启 --profile 时挂上请求计时钩子"""
+        profiler = casts_profile.active()
+        if profiler is not None:
+            kwargs['trace_configs'] = list(kwargs.get('trace_configs') or []) + [profiler.trace_config()]
+        return aiohttp.ClientSession(connector=self.create_connector(), **kwargs)
+
+
+def connection_options(func):
+    """为命令添加连接池相关的命令行参数"""
+    options = [
+        click.option('--net-config', type=click.Path(exists=True, dir_okay=False), default=None,
+                     help='连接池配置文件（JSON，键名同下列参数，如 {"conn_per_host": 8}）'),
+        click.option('--conn-limit', type=int, default=None, help='总连接数上限（默认 100，0 不限）'),
+        click.option('--conn-per-host', type=int, default=None, help='单主机连接数上限（默认 0，不限）'),
+        click.option('--dns-ttl', type=int, default=None, help='DNS 缓存秒数（默认 300）'),
+        click.option('--keepalive', type=float, default=None, help='空闲连接保持秒数（默认 30）'),
+        click.option('--happy-eyeballs-delay', type=float, default=None,
+                     help='IPv6/IPv4 Happy Eyeballs 回退延迟秒数（默认 0.25，0 关闭）'),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
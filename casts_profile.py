@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+运行阶段计时（--profile）
+记录各阶段和每个请求的耗时：页面抓取、HTML/RSS/JSON 解析、下载，
+以及 aiohttp 追踪钩子给出的 DNS、建连、首字节时间；
+结束时打印汇总表，可选输出 cProfile 统计和 Chrome trace JSON（chrome://tracing、Perfetto）
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+import click
+
+
+# 当前运行的计时器；未开启 --profile 时为 None，span() 不做任何记录
+_active: Optional['Profiler'] = None
+
+
+class Span:
+    """一段计时记录；cat 为 'parse' 时额外记录线程 CPU 时间"""
+
+    __slots__ = ('profiler', 'name', 'cat', 'args', 'start', 'wall', 'cpu', 'thread', '_cpu_start')
+
+    def __init__(self, profiler: 'Profiler', name: str, cat: str, args: dict):
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0.0
+        self.wall = 0.0
+        self.cpu: Optional[float] = None
+        self.thread = threading.get_ident()
+
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter()
+        if self.cat == 'parse':
+            self._cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self.start
+        if self.cat == 'parse':
+            self.cpu = time.thread_time() - self._cpu_start
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.profiler.spans.append(self)
+        return False
+
+
+def span(name: str, cat: str = 'phase', **args):
+    """
+    记录一段代码的耗时（with span(...):），同步和异步代码中均可使用
+    cat: 'phase'（含等待网络的阶段，只计墙钟时间）、'parse'（纯计算，同时计 CPU 时间）、'download'
+    """
+    if _active is None:
+        return contextlib.nullcontext()
+    return Span(_active, name, cat, args)
+
+
+def active() -> Optional['Profiler']:
+    return _active
+
+
+class Profiler:
+    """收集一次运行中的所有计时记录"""
+
+    def __init__(self, stats_path: Optional[str] = None, trace_path: Optional[str] = None):
+        self.stats_path = stats_path
+        self.trace_path = trace_path
+        self.spans: List[Span] = []
+        self.started = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self._cpu_started = 0.0
+        self._cprofile = None   # cProfile.Profile，仅 --profile-stats 时创建
+
+    def start(self):
+        global _active
+        _active = self
+        self.started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        if self.stats_path:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        global _active
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.wall = time.perf_counter() - self.started
+        self.cpu = time.process_time() - self._cpu_started
+        _active = None
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """aiohttp 追踪钩子：每个请求记录排队、DNS、建连和首字节（响应头到达）时间"""
+        config = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace())
+
+        async def on_request_start(session, ctx, params):
+            ctx.start = time.perf_counter()
+            ctx.timings = {}
+
+        def phase(name):
+            async def on_start(session, ctx, params):
+                setattr(ctx, name, time.perf_counter())
+
+            async def on_end(session, ctx, params):
+                started = getattr(ctx, name, None)
+                if started is not None and hasattr(ctx, 'timings'):
+                    ctx.timings[name] = ctx.timings.get(name, 0.0) + time.perf_counter() - started
+            return on_start, on_end
+
+        async def on_request_end(session, ctx, params):
+            self._record_request(ctx, params.method, params.url, params.response.status)
+
+        async def on_request_exception(session, ctx, params):
+            self._record_request(ctx, params.method, params.url, type(params.exception).__name__)
+
+        config.on_request_start.append(on_request_start)
+        for name, start_signal, end_signal in (
+            ('queued', config.on_connection_queued_start, config.on_connection_queued_end),
+            ('dns', config.on_dns_resolvehost_start, config.on_dns_resolvehost_end),
+            ('connect', config.on_connection_create_start, config.on_connection_create_end),
+        ):
+            on_start, on_end = phase(name)
+            start_signal.append(on_start)
+            end_signal.append(on_end)
+        config.on_request_end.append(on_request_end)
+        config.on_request_exception.append(on_request_exception)
+        return config
+
+    def _record_request(self, ctx, method: str, url, status):
+        if not hasattr(ctx, 'start'):
+            return
+        record = Span(self, f"{method} {url.host}", 'request', {'url': str(url), 'status': status, **ctx.timings})
+        record.start = ctx.start
+        record.wall = time.perf_counter() - ctx.start   # 从发起到收到响应头（TTFB）
+        self.spans.append(record)
+
+    def summary(self):
+        """打印按阶段和按主机汇总的耗时"""
+        click.echo(f"\n[*] Profile: wall {self.wall:.3f}s, CPU {self.cpu:.3f}s")
+
+        phases: Dict[str, List[Span]] = defaultdict(list)
+        hosts: Dict[str, List[Span]] = defaultdict(list)
+        for record in self.spans:
+            if record.cat == 'request':
+                hosts[urlparse(record.args['url']).netloc].append(record)
+            else:
+                phases[record.name].append(record)
+
+        if phases:
+            width = max(24, *(len(name) for name in phases))
+            click.echo(f"\n{'Phase':<{width}}  {'Count':>6}  {'Wall total':>10}  {'Mean':>8}  {'Max':>8}  {'CPU total':>9}")
+            for name, records in sorted(phases.items(), key=lambda item: -sum(r.wall for r in item[1])):
+                walls = [r.wall for r in records]
+                cpus = [r.cpu for r in records if r.cpu is not None]
+                cpu = f"{sum(cpus):>8.3f}s" if cpus else f"{'-':>9}"
+                click.echo(
+                    f"{name:<{width}}  {len(records):>6}  {sum(walls):>9.3f}s  "
+                    f"{sum(walls) / len(walls):>7.3f}s  {max(walls):>7.3f}s  {cpu}"
+                )
+
+        if hosts:
+            width = max(24, *(len(host) for host in hosts))
+            click.echo(f"\n{'Host':<{width}}  {'Requests':>8}  {'DNS':>8}  {'Connect':>8}  {'Queued':>8}  {'TTFB':>8}  {'TTFB max':>8}")
+            for host, records in sorted(hosts.items(), key=lambda item: -sum(r.wall for r in item[1])):
+                def mean(key):
+                    return sum(r.args.get(key, 0.0) for r in records) / len(records)
+                walls = [r.wall for r in records]
+                click.echo(
+                    f"{host:<{width}}  {len(records):>8}  {mean('dns'):>7.3f}s  {mean('connect'):>7.3f}s  "
+                    f"{mean('queued'):>7.3f}s  {sum(walls) / len(walls):>7.3f}s  {max(walls):>7.3f}s"
+                )
+            click.echo("(DNS/Connect/Queued/TTFB are per-request means; TTFB counts until response headers)")
+
+        click.echo("(concurrent phases overlap, so their totals can exceed the wall time)")
+
+    def write_stats(self):
+        """保存 cProfile 统计（python -m pstats <file> 查看）"""
+        if self._cprofile is None:
+            return
+        self._cprofile.dump_stats(self.stats_path)
+        click.echo(f"[+] cProfile stats written: {self.stats_path}")
+
+    def write_trace(self):
+        """
+        保存 Chrome trace JSON
+        同一类别中时间重叠的记录分配到不同的行（tid），避免异步任务在时间线上错误嵌套
+        """
+        if not self.trace_path:
+            return
+        pid = os.getpid()
+        events = []
+        lanes: Dict[str, List[float]] = defaultdict(list)   # 类别 → 每行最后结束的时间
+        lane_ids: Dict[tuple, int] = {}
+        for record in sorted(self.spans, key=lambda r: r.start):
+            rows = lanes[record.cat]
+            end = record.start + record.wall
+            row = next((i for i, busy_until in enumerate(rows) if busy_until <= record.start), None)
+            if row is None:
+                row = len(rows)
+                rows.append(end)
+            else:
+                rows[row] = end
+            if (record.cat, row) not in lane_ids:
+                lane_ids[(record.cat, row)] = tid = len(lane_ids) + 1
+                events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid,
+                               'args': {'name': f"{record.cat} {row + 1}"}})
+            args = dict(record.args)
+            if record.cpu is not None:
+                args['cpu_ms'] = round(record.cpu * 1000, 3)
+            events.append({
+                'ph': 'X', 'name': record.name, 'cat': record.cat, 'pid': pid, 'tid': lane_ids[(record.cat, row)],
+                'ts': round((record.start - self.started) * 1e6, 1), 'dur': round(record.wall * 1e6, 1),
+                'args': args,
+            })
+        with open(self.trace_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        click.echo(f"[+] Chrome trace written: {self.trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+
+
+@contextlib.contextmanager
+def profiling(params: dict):
+    """按命令行参数开启计时，结束时（包括出错退出时）打印汇总并写出文件"""
+    if not (params.get('profile') or params.get('profile_stats') or params.get('profile_trace')):
+        yield None
+        return
+    profiler = Profiler(params.get('profile_stats'), params.get('profile_trace'))
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.summary()
+        profiler.write_stats()
+        profiler.write_trace()
+
+
+def profile_options(func):
+    """为命令添加计时相关的命令行参数"""
+    options = [
+        click.option('--profile', is_flag=True, help='记录各阶段和请求的耗时，结束时打印汇总'),
+        click.option('--profile-stats', type=click.Path(dir_okay=False), default=None,
+                     help='同时运行 cProfile 并保存统计到该文件（隐含 --profile）'),
+        click.option('--profile-trace', type=click.Path(dir_okay=False), default=None,
+                     help='保存 Chrome trace JSON 到该文件，用于火焰图查看（隐含 --profile）'),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+字节级下载进度
+汇总所有进行中的传输：终端进度条显示总速率、各传输速率和剩余时间，
+可选地向文件描述符输出 JSON lines 进度流供任务调度器采集
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional, TextIO
+
+from tqdm import tqdm
+
+
+def format_rate(rate: float) -> str:
+    """字节/秒 → MB/s 文本"""
+    return f"{rate / 1024 / 1024:.1f} MB/s"
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '--:--'
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class TransferProgress:
+    """单个文件的传输进度，由 TransferEngine 在读取数据时更新"""
+
+    def __init__(self, tracker: 'ProgressTracker', name: str):
+        self._tracker = tracker
+        self.name = name
+        self.total = 0          # 文件总大小，未知时为 0
+        self.done = 0           # 已接收字节（含续传前已有的部分）
+        self.rate = 0.0         # 滑动平均速率（字节/秒）
+        self.started_at = time.monotonic()
+        self._sample_time = self.started_at
+        self._sample_done = 0
+
+    def start(self, total: int, offset: int = 0):
+        """开始（或重试后重新开始）一次传输；offset 为续传起点"""
+        self._tracker._on_start(self, total, offset)
+
+    def update(self, size: int):
+        self._tracker._on_update(self, size)
+
+    def finish(self, success: bool):
+        self._tracker._on_finish(self, success)
+
+    def _sample(self, now: float):
+        """按时间窗口更新速率"""
+        elapsed = now - self._sample_time
+        if elapsed >= 0.5:
+            rate = (self.done - self._sample_done) / elapsed
+            self.rate = rate if not self.rate else 0.6 * self.rate + 0.4 * rate
+            self._sample_time = now
+            self._sample_done = self.done
+
+
+class ProgressTracker:
+    """
+    所有下载共享的字节进度
+
+    open()/close()（或 with 语句）按引用计数管理终端进度条，批量模式下多个源并行时共用一条；
+    stream 不为空时输出 JSON lines：start / progress（每 interval 秒）/ end / summary
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, show_bar: bool = True, interval: float = 1.0):
+        self.stream = stream
+        self.show_bar = show_bar
+        self.interval = interval
+        self.active: Dict[int, TransferProgress] = {}
+        self.total = 0              # 本次运行已开始传输的总字节数
+        self.done = 0               # 其中已接收的字节数
+        self.rate = 0.0
+        self._users = 0
+        self._bar: Optional[tqdm] = None
+        self._last_refresh = 0.0
+        self._last_emit = 0.0
+        self._sample_time = time.monotonic()
+        self._sample_done = 0
+        self._completed = 0
+        self._failed = 0
+
+    @classmethod
+    def from_params(cls, params: dict) -> 'ProgressTracker':
+        """由命令行参数构建；--progress-fd 指定 JSON lines 输出的文件描述符"""
+        stream = None
+        if params.get('progress_fd') is not None:
+            try:
+                stream = os.fdopen(params['progress_fd'], 'w', buffering=1, encoding='utf-8', closefd=False)
+            except OSError as e:
+                raise ValueError(f"无法打开进度输出描述符 {params['progress_fd']}: {e}")
+        return cls(stream)
+
+    def transfer(self, name: str) -> TransferProgress:
+        return TransferProgress(self, name)
+
+    def open(self):
+        """开始一批下载"""
+        self._users += 1
+        if self._users == 1 and self.show_bar:
+            self._bar = tqdm(
+                total=0, unit='B', unit_scale=True, desc="Bytes", leave=False,
+                bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} {postfix}'
+            )
+
+    def close(self):
+        """结束一批下载；最后一批结束时关闭进度条并输出汇总"""
+        self._users -= 1
+        if self._users > 0:
+            return
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+        self._emit('summary', completed=self._completed, failed=self._failed, bytes=self.done)
+
+    def __enter__(self) -> 'ProgressTracker':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def eta(self) -> Optional[float]:
+        """进行中传输的剩余时间（只计入已知大小的传输）"""
+        remaining = sum(max(0, t.total - t.done) for t in self.active.values() if t.total)
+        if not remaining:
+            return 0.0 if self.active else None
+        return remaining / self.rate if self.rate > 0 else None
+
+    def _on_start(self, transfer: TransferProgress, total: int, offset: int):
+        previous = 0
+        if id(transfer) in self.active:
+            # 重试：撤销上一次尝试的计数，以新的续传起点为准
+            previous = transfer.done
+            self.total -= transfer.total
+            self.done -= transfer.done
+        else:
+            transfer.started_at = time.monotonic()
+        self.active[id(transfer)] = transfer
+        transfer.total = max(total, offset)
+        transfer.done = offset
+        transfer._sample_done = offset
+        transfer._sample_time = time.monotonic()
+        self.total += transfer.total
+        self.done += offset
+        self._sample_done += offset - previous  # 续传前已有的字节不计入速率
+        self._emit('start', file=transfer.name, total=transfer.total, offset=offset)
+        self._refresh(force=True)
+
+    def _on_update(self, transfer: TransferProgress, size: int):
+        transfer.done += size
+        self.done += size
+        if transfer.done > transfer.total:
+            # 大小未知或服务器多发了数据
+            self.total += transfer.done - transfer.total
+            transfer.total = transfer.done
+        self._refresh()
+
+    def _on_finish(self, transfer: TransferProgress, success: bool):
+        if self.active.pop(id(transfer), None) is None:
+            return
+        if success:
+            self._completed += 1
+        else:
+            self._failed += 1
+            self.total -= max(0, transfer.total - transfer.done)
+        elapsed = time.monotonic() - transfer.started_at
+        self._emit('end', file=transfer.name, ok=success, bytes=transfer.done,
+                   seconds=round(elapsed, 3), rate=round(transfer.done / elapsed if elapsed > 0 else 0.0))
+        self._refresh(force=True)
+
+    def _refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_refresh < 0.5:
+            return
+        elapsed = now - self._sample_time
+        if elapsed >= 0.5:
+            rate = (self.done - self._sample_done) / elapsed
+            self.rate = rate if not self.rate else 0.6 * self.rate + 0.4 * rate
+            self._sample_time = now
+            self._sample_done = self.done
+        for transfer in self.active.values():
+            transfer._sample(now)
+
+        if self._bar is not None:
+            rates = ', '.join(format_rate(t.rate) for t in list(self.active.values())[:4])
+            self._bar.total = self.total
+            self._bar.n = self.done
+            self._bar.set_postfix_str(
+                f"{format_rate(self.rate)}, ETA {format_eta(self.eta())}, "
+                f"{len(self.active)} active" + (f" ({rates})" if rates else ''),
+                refresh=True
+            )
+
+        if self.stream is not None and now - self._last_emit >= self.interval:
+            self._last_emit = now
+            self._emit('progress', downloaded=self.done, total=self.total, rate=round(self.rate),
+                       eta=None if self.eta() is None else round(self.eta(), 1),
+                       transfers=[{'file': t.name, 'downloaded': t.done, 'total': t.total, 'rate': round(t.rate)}
+                                  for t in self.active.values()])
+        self._last_refresh = now
+
+    def _emit(self, event: str, **fields):
+        if self.stream is None:
+            return
+        try:
+            self.stream.write(json.dumps({'event': event, 'time': round(time.time(), 3), **fields},
+                                         ensure_ascii=False) + '\n')
+        except (OSError, ValueError):
+            self.stream = None  # 读取端已关闭，停止输出
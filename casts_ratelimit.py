@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+下载限速
+令牌桶实现的全局限速（所有下载共享）和单文件限速，全局速率可按一天中的时段切换；
+未设置任何限速时不创建限速器，下载循环没有额外开销
+"""
+
+import asyncio
+import re
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import click
+
+
+UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+RATE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:I?B)?(?:/S)?\s*$')
+WINDOW_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*=\s*(.+)$')
+# 时段表重新判断当前速率的间隔（秒）
+SCHEDULE_CHECK_INTERVAL = 30.0
+
+
+def parse_rate(value: str) -> int:
+    """解析速率（字节/秒），支持 K/M/G 后缀（1024 进制），如 500K、2M、1.5MB/s；0 表示不限"""
+    match = RATE_PATTERN.match(value.upper())
+    if not match:
+        raise ValueError(f"无法识别的速率: {value}")
+    number, unit = match.groups()
+    return int(float(number) * UNITS[unit])
+
+
+def parse_schedule(value: str) -> List[Tuple[int, int, int]]:
+    """
+    解析时段表：逗号分隔的 HH:MM-HH:MM=速率，结束早于开始表示跨过午夜
+    如 "09:00-18:00=1M,18:00-23:00=4M"；返回 [(起始分钟, 结束分钟, 字节/秒)]
+    """
+    windows = []
+    for part in value.split(','):
+        if not part.strip():
+            continue
+        match = WINDOW_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"无法识别的时段: {part.strip()}（格式 HH:MM-HH:MM=速率）")
+        start_h, start_m, end_h, end_m, rate = match.groups()
+        start, end = int(start_h) * 60 + int(start_m), int(end_h) * 60 + int(end_m)
+        if max(start, end) > 24 * 60 or int(start_m) >= 60 or int(end_m) >= 60:
+            raise ValueError(f"无效的时间: {part.strip()}")
+        windows.append((start, end, parse_rate(rate)))
+    return windows
+
+
+class TokenBucket:
+    """
+    令牌桶：按 rate 字节/秒补充，最多积累 burst 字节
+
+    取用时允许透支，透支多少就等待多少时间还清；并发的多个下载依次看到更深的透支，
+    总速率因此保持在 rate。rate 为 0 时不限速
+    """
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: int, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    @property
+    def capacity(self) -> int:
+        # 默认允许约 1 秒的突发
+        return self.burst if self.burst is not None else self.rate
+
+    async def consume(self, size: int):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - size
+        self.updated = now
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class BandwidthLimiter:
+    """
+    全局限速器，批量模式下所有下载器共享一个实例
+
+    schedule 中的时段命中时使用该时段的速率，否则使用 rate；
+    per_transfer 为每个文件（分段下载时为各分段合计）的速率上限
+    """
+
+    def __init__(self, rate: int = 0, per_transfer: int = 0, schedule: Optional[List[Tuple[int, int, int]]] = None):
+        self.default_rate = rate
+        self.per_transfer = per_transfer
+        self.schedule = schedule or []
+        self.bucket = TokenBucket(self.current_rate())
+        self._next_check = time.monotonic() + SCHEDULE_CHECK_INTERVAL
+
+    @classmethod
+    def from_params(cls, params: dict) -> Optional['BandwidthLimiter']:
+        """由命令行参数构建；没有任何限速时返回 None"""
+        rate = params.get('limit_rate') or 0
+        per_transfer = params.get('limit_rate_per_file') or 0
+        schedule = params.get('limit_schedule') or []
+        if not (rate or per_transfer or schedule):
+            return None
+        return cls(rate, per_transfer, schedule)
+
+    def current_rate(self, now: Optional[datetime] = None) -> int:
+        """当前时段的全局速率（字节/秒，0 为不限）"""
+        if not self.schedule:
+            return self.default_rate
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        for start, end, rate in self.schedule:
+            if (start <= minute < end) if start <= end else (minute >= start or minute < end):
+                return rate
+        return self.default_rate
+
+    def transfer(self) -> 'TransferThrottle':
+        """为一个文件的下载创建限速句柄"""
+        return TransferThrottle(self, TokenBucket(self.per_transfer) if self.per_transfer else None)
+
+    async def consume(self, size: int):
+        if self.schedule:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + SCHEDULE_CHECK_INTERVAL
+                self.bucket.rate = self.current_rate()
+        await self.bucket.consume(size)
+
+
+class TransferThrottle:
+    """单个文件的限速句柄：先受单文件速率限制，再计入全局速率"""
+
+    __slots__ = ('limiter', 'bucket')
+
+    def __init__(self, limiter: BandwidthLimiter, bucket: Optional[TokenBucket]):
+        self.limiter = limiter
+        self.bucket = bucket
+
+    async def consume(self, size: int):
+        if self.bucket is not None:
+            await self.bucket.consume(size)
+        await self.limiter.consume(size)
+
+
+def _rate_callback(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return parse_rate(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def _schedule_callback(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return parse_schedule(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def ratelimit_options(func):
+    """为命令添加限速相关的命令行参数"""
+    options = [
+        click.option('--limit-rate', default=None, callback=_rate_callback,
+                     help='全局下载限速（字节/秒，支持 K/M/G 后缀，如 2M；所有下载共享）'),
+        click.option('--limit-rate-per-file', default=None, callback=_rate_callback,
+                     help='单个文件的下载限速（如 500K）'),
+        click.option('--limit-schedule', default=None, callback=_schedule_callback,
+                     help='按时段切换全局限速，如 "09:00-18:00=1M,18:00-23:00=4M"（0 为不限；其余时段用 --limit-rate）'),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+下载重试策略
+区分可重试错误（连接重置、超时、5xx、429）和永久错误（403、404 等），
+按带抖动的指数退避重试，整次运行共享一个重试预算
+"""
+
+import asyncio
+import email.utils
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+import click
+
+
+T = TypeVar('T')
+
+# 可以重试的 HTTP 状态码
+RETRIABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """
+    带指数退避和抖动的重试策略
+
+    第 n 次重试等待 base_delay * 2^n 秒（上限 max_delay）的一半到全部之间的随机值；
+    服务器给出 Retry-After 时至少等待该时间（上限 max_retry_after）。
+    budget 为整次运行的重试总数上限，批量模式下所有下载共享，避免源站故障时无休止重试。
+    续传由 TransferEngine 的 .tmp 和侧车完成，重试只需再次调用下载
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        budget: Optional[int] = 100,
+        max_retry_after: float = 300.0
+    ):
+        self.retries = max(0, retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget        # 剩余重试次数，None 表示不限
+        self.max_retry_after = max_retry_after
+        self._budget_warned = False
+
+    @classmethod
+    def from_params(cls, params: dict) -> 'RetryPolicy':
+        """由命令行参数构建"""
+        return cls(retries=params.get('retries', 3), budget=params.get('retry_budget', 100))
+
+    @staticmethod
+    def is_retriable(exc: BaseException) -> bool:
+        """判断错误是否值得重试"""
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return exc.status in RETRIABLE_STATUSES
+        return isinstance(exc, (
+            asyncio.TimeoutError,
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+        ))
+
+    @staticmethod
+    def retry_after(exc: BaseException) -> Optional[float]:
+        """读取响应的 Retry-After（秒数或 HTTP 日期），没有时返回 None"""
+        headers = getattr(exc, 'headers', None)
+        value = headers.get('Retry-After') if headers else None
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt: int, exc: BaseException) -> float:
+        """第 attempt 次重试（从 0 开始）前的等待秒数"""
+        backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
+        hint = self.retry_after(exc)
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_retry_after))
+        return delay
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[T]],
+        label: str = '',
+        notify: Callable[[str], None] = click.echo
+    ) -> T:
+        """
+        调用 func，可重试的错误按策略重试
+        重试次数或预算用尽、或遇到永久错误时抛出最后一次的异常
+        """
+        attempt = 0
+        while True:
+            try:
+                return await func()
+            except Exception as e:
+                if attempt >= self.retries or not self.is_retriable(e):
+                    raise
+                if self.budget is not None:
+                    if self.budget <= 0:
+                        if not self._budget_warned:
+                            self._budget_warned = True
+                            notify("[!] Retry budget exhausted, remaining failures will not be retried")
+                        raise
+                    self.budget -= 1
+
+                wait = self.delay(attempt, e)
+                attempt += 1
+                reason = f"HTTP {e.status}" if isinstance(e, aiohttp.ClientResponseError) else type(e).__name__
+                notify(f"[!] Retry {attempt}/{self.retries} in {wait:.1f}s: {label} ({reason})")
+                await asyncio.sleep(wait)
+
+
+def retry_options(func):
+    """为命令添加重试相关的命令行参数"""
+    options = [
+        click.option('--retries', type=int, default=3, help='单个文件遇到临时错误时的最大重试次数（默认 3）'),
+        click.option('--retry-budget', type=int, default=100, help='整次运行的重试总数上限（默认 100）'),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+下载并发调度
+按主机自适应调整并发数（AIMD），--concurrent 作为所有主机合计的上限
+"""
+
+import asyncio
+import math
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+
+# 表示服务器过载、应当立即减半并发的状态码
+OVERLOAD_STATUSES = (429, 503)
+
+
+class HostState:
+    """单个主机的并发额度和吞吐观测值"""
+
+    def __init__(self, limit: float):
+        self.limit = limit          # 当前允许的并发数（小数部分用于加性增长）
+        self.active = 0
+        self.waiting = 0
+        self.rate: Optional[float] = None   # 单个传输速率的滑动平均（字节/秒）
+        self.peak_rate = 0.0                # 观测到的最佳速率，缓慢衰减
+
+
+class HostSlot:
+    """一次下载占用的并发额度，退出时根据结果调整所属主机的并发数"""
+
+    def __init__(self, scheduler: 'HostScheduler', host: str):
+        self._scheduler = scheduler
+        self.host = host
+        self.size = None
+        self._started = 0.0
+        self._moving = False
+
+    def done(self, size: int):
+        """记录成功传输的字节数，用于计算吞吐"""
+        self.size = size
+
+    async def redirected(self, url):
+        """
+        请求被重定向到其他主机时把额度转到最终主机（等待该主机有空闲并发）
+        音频地址大多经过统计跳转（podtrac 等），实际传输和限流发生在跳转后的 CDN 上，
+        吞吐和过载反馈都应记在 CDN 名下；分段下载的多个分段同时调用时只转移一次
+        """
+        host = urlparse(str(url)).netloc.lower()
+        if not host or host == self.host or self._moving:
+            return
+        self._moving = True
+        try:
+            await self._scheduler._move(self.host, host)
+            self.host = host
+        finally:
+            self._moving = False
+
+    async def __aenter__(self) -> 'HostSlot':
+        await self._scheduler._acquire(self.host)
+        self._started = asyncio.get_running_loop().time()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        elapsed = asyncio.get_running_loop().time() - self._started
+        await self._scheduler._release(self.host, self.size, elapsed, exc)
+        return False
+
+
+class HostScheduler:
+    """
+    按主机的自适应并发调度器
+
+    - 成功完成且单连接速率没有明显下降时，主机并发数加性增长（每轮 +1）
+    - 单连接速率跌到峰值一半以下（主机带宽已饱和）时缓慢回退
+    - 429/503 立即减半，超时和连接错误回退到 3/4
+    所有主机的并发合计不超过 limit；多个主机争用时每个主机不超过公平份额，
+    空闲额度仍可由其他主机使用。批量模式下所有下载器共享同一个调度器
+    开始下载时按请求地址的主机取额度，响应跟随重定向后由 HostSlot.redirected 转到最终主机
+    """
+
+    def __init__(self, limit: int = 3):
+        self.limit = max(1, limit)
+        self._hosts: Dict[str, HostState] = {}
+        self._active = 0
+        self._condition: Optional[asyncio.Condition] = None  # 在事件循环内首次使用时创建
+
+    def slot(self, url: str) -> HostSlot:
+        """获取 url 所在主机的并发额度（async with）"""
+        return HostSlot(self, urlparse(url).netloc.lower())
+
+    def host_limits(self) -> Dict[str, int]:
+        """各主机当前的并发数"""
+        return {name: int(state.limit) for name, state in self._hosts.items()}
+
+    def _host(self, host: str) -> HostState:
+        if host not in self._hosts:
+            self._hosts[host] = HostState(float(self.limit))
+        return self._hosts[host]
+
+    def _can_start(self, state: HostState) -> bool:
+        if self._active >= self.limit or state.active >= int(state.limit):
+            return False
+        demanding = [s for s in self._hosts.values() if s.active or s.waiting]
+        share = math.ceil(self.limit / max(1, len(demanding)))
+        if state.active < share:
+            return True
+        # 超出公平份额时，只有其他主机没有可以启动的任务才占用空闲额度
+        return not any(
+            s is not state and s.waiting and s.active < min(int(s.limit), share)
+            for s in demanding
+        )
+
+    async def _acquire(self, host: str):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        state = self._host(host)
+        async with self._condition:
+            state.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self._can_start(state))
+            finally:
+                state.waiting -= 1
+            state.active += 1
+            self._active += 1
+
+    async def _move(self, old: str, new: str):
+        """把一个进行中的下载从 old 主机转到 new 主机，全局占用数不变"""
+        source, target = self._hosts[old], self._host(new)
+        async with self._condition:
+            target.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: target.active < int(target.limit))
+            finally:
+                target.waiting -= 1
+            source.active -= 1
+            target.active += 1
+            self._condition.notify_all()
+
+    async def _release(self, host: str, size: Optional[int], elapsed: float, exc: Optional[BaseException]):
+        state = self._hosts[host]
+        if exc is None and size:
+            self._on_success(state, size / max(elapsed, 1e-3))
+        elif exc is not None:
+            self._on_failure(state, exc)
+        async with self._condition:
+            state.active -= 1
+            self._active -= 1
+            self._condition.notify_all()
+
+    def _on_success(self, state: HostState, rate: float):
+        state.rate = rate if state.rate is None else 0.7 * state.rate + 0.3 * rate
+        state.peak_rate = max(state.peak_rate * 0.98, state.rate)
+        if state.rate < 0.5 * state.peak_rate:
+            state.limit = max(1.0, state.limit * 0.8)
+        else:
+            state.limit = min(float(self.limit), state.limit + 1 / state.limit)
+
+    def _on_failure(self, state: HostState, exc: BaseException):
+        if isinstance(exc, aiohttp.ClientResponseError) and exc.status in OVERLOAD_STATUSES:
+            state.limit = max(1.0, state.limit / 2)
+        elif isinstance(exc, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+            state.limit = max(1.0, state.limit * 0.75)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+内容寻址音频存储（--store）
+下载完成的音频按 sha256 存放一份，输出目录中的文件是指向它的硬链接（或 reflink / 副本）；
+(音频 URL, ETag / Last-Modified) → sha256 的索引让同一音频出现在多个输出目录或改名重发时不再重复下载
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+# Linux FICLONE ioctl：在支持的文件系统（Btrfs、XFS 等）上创建共享数据块的副本
+FICLONE = 0x40049409
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def default_store_path() -> Path:
+    """默认存储目录：$XDG_DATA_HOME/casts_down/store 或 ~/.local/share/casts_down/store"""
+    base = os.environ.get('XDG_DATA_HOME') or Path.home() / '.local' / 'share'
+    return Path(base) / 'casts_down' / 'store'
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _reflink(source: Path, target: Path):
+    import fcntl
+
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            target.unlink()
+            raise
+
+
+def place(source: Path, target: Path) -> str:
+    """
+    把 source 放到 target（原子替换已有文件）
+    依次尝试硬链接、reflink、复制，返回使用的方式：'hardlink'、'reflink' 或 'copy'
+    """
+    temp = target.with_name(f".{target.name}.{os.getpid()}.link")
+    try:
+        temp.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(source, temp)
+        method = 'hardlink'
+    except OSError:
+        # 跨文件系统（EXDEV）或文件系统不支持硬链接
+        try:
+            _reflink(source, temp)
+            method = 'reflink'
+        except (OSError, ImportError):   # 非 Linux 没有 fcntl / FICLONE
+            shutil.copyfile(source, temp)
+            method = 'copy'
+    os.replace(temp, target)
+    return method
+
+
+class ContentStore:
+    """
+    内容寻址存储：objects/<sha256 前两位>/<sha256> 存放音频数据，store.sqlite 记录来源
+
+    identities 表以音频 URL 为键，记录下载时的 ETag、Last-Modified 和内容 sha256：
+    再次遇到同一 URL 时由调用方用这两个校验值确认内容未变，然后直接链接已有对象；
+    不同 URL 下载到相同内容时按 sha256 合并为同一对象。
+    方法会在线程池中调用，数据库访问用锁串行化
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS identities (
+            url        TEXT PRIMARY KEY,
+            etag          TEXT,
+            last_modified TEXT,
+            sha256        TEXT NOT NULL,
+            size          INTEGER NOT NULL,
+            updated_at    REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS identities_sha256 ON identities (sha256);
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or default_store_path())
+        (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / 'store.sqlite'), timeout=30, check_same_thread=False)
+        # WAL 允许多个进程共用同一个存储
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(identities)")}
+        if 'last_modified' not in columns:
+            # 旧版本创建的存储没有 last_modified 列
+            self._conn.execute("ALTER TABLE identities ADD COLUMN last_modified TEXT")
+
+    def object_path(self, sha256: str) -> Path:
+        return self.root / 'objects' / sha256[:2] / sha256
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """
+        按音频 URL 查找已存储的内容
+        返回: {'etag', 'last_modified', 'sha256', 'size'}；没有记录或对象已丢失、大小不符时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, sha256, size FROM identities WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, sha256, size = row
+        try:
+            if self.object_path(sha256).stat().st_size != size:
+                return None
+        except FileNotFoundError:
+            return None
+        return {'etag': etag, 'last_modified': last_modified, 'sha256': sha256, 'size': size}
+
+    def restore(self, identity: dict, output_path: Path) -> str:
+        """把已存储的对象放到 output_path，返回放置方式"""
+        return place(self.object_path(identity['sha256']), output_path)
+
+    def ingest(self, url: str, etag: Optional[str], last_modified: Optional[str], path: Path) -> str:
+        """
+        收录刚下载完成的文件并记录 (URL, ETag, Last-Modified) → sha256
+        内容已存在时把 path 替换为指向已有对象的链接（重复内容只占一份空间），
+        否则把 path 硬链接为新对象；返回 'stored'、'deduplicated' 或 'copied'
+        """
+        sha256 = file_sha256(path)
+        size = path.stat().st_size
+        target = self.object_path(sha256)
+        target.parent.mkdir(exist_ok=True)
+
+        result = 'stored'
+        try:
+            os.link(path, target)
+        except FileExistsError:
+            if os.path.samefile(path, target):
+                pass
+            elif target.stat().st_size == size:
+                place(target, path)
+                result = 'deduplicated'
+            else:
+                # 对象文件损坏（大小不符），用新下载的内容替换
+                place(path, target)
+        except OSError:
+            # 存储与输出目录不在同一文件系统：复制一份进存储
+            temp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            shutil.copyfile(path, temp)
+            os.replace(temp, target)
+            result = 'copied'
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO identities (url, etag, last_modified, sha256, size, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, sha256, size, time.time())
+            )
+        return result
+
+    def forget(self, url: str):
+        """删除 URL 的记录（内容已变化时调用）"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM identities WHERE url = ?", (url,))
+
+    def close(self):
+        self._conn.close()
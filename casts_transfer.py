@@ -0,0 +1,678 @@
+#!/usr/bin/env python3
+"""
+音频传输层
+为 podcast_dl 和 xiaoyuzhou_dl 提供共享的断点续传 / 分段并行下载实现、
+传输相关的命令行参数，以及单集下载的公共流程（跳过、存储复用、重试、记入清单）
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import aiohttp
+import click
+from tqdm import tqdm
+
+from casts_manifest import DownloadManifest
+from casts_profile import span
+from casts_progress import TransferProgress
+from casts_ratelimit import BandwidthLimiter, TransferThrottle
+from casts_scheduler import HostSlot
+from casts_store import ContentStore
+
+
+class RangeNotSupported(Exception):
+    """服务器未按请求返回 206 分段内容"""
+
+
+class PartialDownload:
+    """
+    未完成的下载：.tmp 数据文件 + .tmp.json 侧车元数据
+
+    侧车记录 URL、ETag/Last-Modified 和已写入字节数，
+    下次下载同一 URL 时据此发送 Range/If-Range 请求续传。
+    分段下载额外记录每个分段的 [起点, 终点, 已完成字节]
+    """
+
+    def __init__(self, output_path: Path):
+        self.temp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+        self.meta_path = output_path.with_suffix(output_path.suffix + '.tmp.json')
+        self.url = None
+        self.etag = None
+        self.last_modified = None
+        self.total_size = 0
+        self.downloaded = 0
+        self.segments: Optional[List[List[int]]] = None
+
+    @property
+    def validator(self) -> Optional[str]:
+        """If-Range 使用的校验值（优先强 ETag）"""
+        if self.etag and not self.etag.startswith('W/'):
+            return self.etag
+        return self.last_modified
+
+    def load(self, url: str) -> bool:
+        """
+        读取侧车，判断能否续传
+        侧车缺失、URL 不一致或没有校验值时返回 False
+        """
+        if not self.temp_path.exists() or not self.meta_path.exists():
+            return False
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return False
+        if meta.get('url') != url:
+            return False
+
+        self.url = url
+        self.etag = meta.get('etag')
+        self.last_modified = meta.get('last_modified')
+        self.total_size = meta.get('total_size', 0)
+        self.segments = meta.get('segments')
+        if not self.validator:
+            return False
+
+        if self.segments:
+            self.downloaded = sum(done for _, _, done in self.segments)
+        else:
+            # 以磁盘上的实际大小为准，进程被强制终止时侧车计数可能滞后
+            self.downloaded = self.temp_path.stat().st_size
+        return True
+
+    def begin(self, url: str, headers, offset: int = 0):
+        """根据响应头记录校验值和总大小"""
+        self.url = url
+        self.etag = headers.get('ETag')
+        self.last_modified = headers.get('Last-Modified')
+        self.downloaded = offset
+
+        content_range = headers.get('Content-Range', '')
+        if '/' in content_range and not content_range.endswith('/*'):
+            self.total_size = int(content_range.rsplit('/', 1)[1])
+        else:
+            self.total_size = offset + int(headers.get('Content-Length', 0))
+
+        # 服务器明确不支持 Range 时，保留的部分文件无法续传
+        if headers.get('Accept-Ranges', '').lower() == 'none':
+            self.etag = self.last_modified = None
+
+    def save(self):
+        """写入侧车；没有校验值的部分文件无法安全续传，直接丢弃"""
+        if not self.validator:
+            self.discard()
+            return
+        meta = {
+            'url': self.url,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'total_size': self.total_size,
+            'downloaded': self.downloaded,
+        }
+        if self.segments:
+            meta['segments'] = self.segments
+        self.meta_path.write_text(json.dumps(meta), encoding='utf-8')
+
+    def discard(self):
+        """删除 .tmp 文件和侧车"""
+        self.segments = None
+        self.downloaded = 0
+        for path in (self.temp_path, self.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def finish(self, output_path: Path):
+        """下载完成：安全重命名并删除侧车"""
+        if output_path.exists():
+            output_path.unlink()
+        self.temp_path.rename(output_path)
+        try:
+            self.meta_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class DiskWriter:
+    """
+    事件循环之外的磁盘写入阶段
+
+    各下载把网络数据块交给 FileSink，由其合并成 buffer_size 大小的写入，
+    提交到共享线程池按偏移写入（os.pwrite）。每个 FileSink 同时只有一个在途写入，
+    下一块在其完成前继续在内存中合并；磁盘跟不上时反压到网络读取，而不是阻塞整个事件循环
+    """
+
+    def __init__(self, buffer_size: int = 1024 * 1024, workers: int = 4):
+        self.buffer_size = max(1, buffer_size)
+        self.workers = max(1, workers)
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()  # 没有 pwrite 的平台上保护 seek + write
+
+    def sink(self, f, position: int) -> 'FileSink':
+        """为文件 f 从 position 开始的顺序写入创建写入端（f 需以无缓冲二进制模式打开）"""
+        return FileSink(self, f, position)
+
+    def submit(self, f, data: bytes, position: int) -> concurrent.futures.Future:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='casts-writer'
+            )
+        return self._executor.submit(self._write_at, f, data, position)
+
+    def _write_at(self, f, data: bytes, position: int):
+        """在写线程中把 data 完整写到 position"""
+        view = memoryview(data)
+        if hasattr(os, 'pwrite'):
+            fd = f.fileno()
+            while view:
+                written = os.pwrite(fd, view, position)
+                view = view[written:]
+                position += written
+        else:
+            with self._lock:
+                f.seek(position)
+                while view:
+                    view = view[f.write(view):]
+
+
+class FileSink:
+    """
+    一段连续区域的写入端：合并小块，同时只有一个在途写入
+
+    写入按顺序逐个完成，文件中不会出现低于末尾的空洞：进程被强制终止（SIGKILL、断电）后
+    .tmp 的实际大小仍是可靠的续传起点（见 PartialDownload.load）。
+    写入失败会在下一次 write/close 时抛出；abort() 返回已确定落盘的连续结束位置，
+    供侧车记录续传进度
+    """
+
+    def __init__(self, writer: DiskWriter, f, position: int):
+        self._writer = writer
+        self._f = f
+        self._position = position   # 下一次提交写入的起点
+        self._buffer = bytearray()
+        self._pending: Optional[concurrent.futures.Future] = None
+        self._pending_at = position  # 在途写入的起点
+        self._error: Optional[BaseException] = None
+
+    async def write(self, data: bytes):
+        self._buffer += data
+        if len(self._buffer) >= self._writer.buffer_size:
+            await self._submit()
+
+    async def close(self) -> int:
+        """写出剩余缓冲并等待全部写入完成，返回结束位置"""
+        await self._submit()
+        await self._wait()
+        if self._error:
+            raise self._error
+        return self._position
+
+    def abort(self) -> int:
+        """
+        下载中断时调用：同步等待在途写入并写出剩余缓冲（至多两个缓冲大小），
+        返回已落盘的连续结束位置
+        """
+        if self._pending is not None:
+            concurrent.futures.wait([self._pending])
+            self._reap()
+        if self._error:
+            return self._pending_at
+        data, self._buffer = self._buffer, bytearray()
+        if data:
+            try:
+                self._writer._write_at(self._f, data, self._position)
+                self._position += len(data)
+            except OSError:
+                pass
+        return self._position
+
+    async def _wait(self):
+        """等待在途写入完成"""
+        if self._pending is not None:
+            waiter = asyncio.wrap_future(self._pending)
+            waiter.add_done_callback(lambda w: w.cancelled() or w.exception())  # 错误经 _reap 上报
+            await asyncio.wait([waiter])
+            self._reap()
+
+    async def _submit(self):
+        await self._wait()
+        if self._error:
+            raise self._error
+        if not self._buffer:
+            return
+        data, self._buffer = self._buffer, bytearray()
+        self._pending = self._writer.submit(self._f, data, self._position)
+        self._pending_at = self._position
+        self._position += len(data)
+
+    def _reap(self):
+        """回收已完成的写入，失败时记录错误（_pending_at 即为已落盘的结束位置）"""
+        future, self._pending = self._pending, None
+        error = future.exception()
+        if error is not None:
+            self._error = error
+
+
+class TransferEngine:
+    """
+    单个音频文件的下载执行器
+
+    失败时保留 .tmp 和侧车，下次调用自动续传；
+    服务器忽略 Range（返回 200）时回退为完整下载。
+    segments > 1 时对足够大的文件按字节区间分段并行下载。
+    磁盘写入由 DiskWriter 在线程池中完成，不阻塞事件循环。
+    传入 store 时下载完成的文件收录进内容寻址存储，已收录的 URL 由 reuse() 直接链接；
+    传入 limiter 时每个读取块按令牌桶限速
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 64 * 1024,
+        timeout: int = 3600,
+        segments: int = 1,
+        min_segment_size: int = 8 * 1024 * 1024,
+        writer: Optional[DiskWriter] = None,
+        store: Optional[ContentStore] = None,
+        limiter: Optional[BandwidthLimiter] = None
+    ):
+        self.chunk_size = max(1, chunk_size)
+        self.timeout = timeout
+        self.segments = max(1, segments)
+        self.min_segment_size = max(1, min_segment_size)
+        self.writer = writer or DiskWriter()
+        self.store = store
+        self.limiter = limiter
+
+    async def reuse(self, session: aiohttp.ClientSession, url: str, output_path: Path) -> Optional[int]:
+        """
+        url 的内容已在存储中时直接放到 output_path，不再下载
+        先发 HEAD 请求确认内容未变：记录了 ETag 时用 If-None-Match（304 或 ETag 相同），
+        否则用 If-Modified-Since（304 或 Last-Modified 相同）；两者都没有记录时无法确认，重新下载。
+        服务器不支持 HEAD 或请求失败时沿用已存储的内容
+        返回: 文件大小；存储中没有或内容已变化时返回 None
+        """
+        if self.store is None:
+            return None
+        loop = asyncio.get_running_loop()
+        identity = await loop.run_in_executor(None, self.store.lookup, url)
+        if identity is None:
+            return None
+
+        if identity['etag']:
+            header, conditional, recorded = 'ETag', 'If-None-Match', identity['etag']
+        elif identity['last_modified']:
+            header, conditional, recorded = 'Last-Modified', 'If-Modified-Since', identity['last_modified']
+        else:
+            return None
+        try:
+            async with session.head(
+                url, headers={conditional: recorded},
+                allow_redirects=True, timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                current = response.headers.get(header)
+                if response.status < 300 and current and current != recorded:
+                    await loop.run_in_executor(None, self.store.forget, url)
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+
+        await loop.run_in_executor(None, self.store.restore, identity, output_path)
+        return identity['size']
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        output_path: Path,
+        progress: Optional[TransferProgress] = None,
+        slot: Optional[HostSlot] = None
+    ) -> int:
+        """
+        下载 url 到 output_path，传入 progress 时按接收的字节更新进度
+        传入 slot 时，重定向到其他主机后把并发额度转到最终主机
+        返回: 最终文件大小（字节）
+        """
+        partial = PartialDownload(output_path)
+        # 每个文件一个限速句柄，分段下载的各分段共用
+        throttle = self.limiter.transfer() if self.limiter is not None else None
+        size = await self._fetch(session, url, output_path, partial, progress, throttle, slot)
+        if self.store is not None:
+            # 计算 sha256 需要读一遍文件，放到线程池中
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.store.ingest, url, partial.etag, partial.last_modified, output_path
+            )
+        return size
+
+    async def _fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        output_path: Path,
+        partial: PartialDownload,
+        progress: Optional[TransferProgress] = None,
+        throttle: Optional[TransferThrottle] = None,
+        slot: Optional[HostSlot] = None
+    ) -> int:
+        """fetch 的下载部分：分段或单连接，必要时续传"""
+        resumable = partial.load(url)
+
+        if (resumable and partial.segments) or (not resumable and self.segments > 1):
+            try:
+                size = await self._fetch_segmented(session, url, partial, resumable, progress, throttle, slot)
+            except RangeNotSupported:
+                size = None
+            if size is not None:
+                partial.finish(output_path)
+                return size
+            # 不满足分段条件或服务器不配合，回退为单连接下载
+            partial.discard()
+            resumable = False
+
+        return await self._fetch_stream(session, url, output_path, partial, resumable, progress, throttle, slot)
+
+    async def _fetch_stream(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        output_path: Path,
+        partial: PartialDownload,
+        resumable: bool,
+        progress: Optional[TransferProgress] = None,
+        throttle: Optional[TransferThrottle] = None,
+        slot: Optional[HostSlot] = None
+    ) -> int:
+        """单连接顺序下载，必要时从 .tmp 末尾续传"""
+        offset = partial.downloaded if resumable else 0
+
+        headers = {}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = partial.validator
+
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+            if offset and response.status == 416:
+                # 部分文件已经是完整内容，或者已失效
+                if partial.total_size and offset >= partial.total_size:
+                    partial.finish(output_path)
+                    return offset
+                partial.discard()
+                return await self._fetch_stream(session, url, output_path, partial, False, progress, throttle, slot)
+
+            response.raise_for_status()
+            if slot:
+                await slot.redirected(response.url)
+
+            if offset and response.status == 206 and not self._range_matches(response, offset):
+                # 返回的区间与请求不一致，无法拼接
+                partial.discard()
+                return await self._fetch_stream(session, url, output_path, partial, False, progress, throttle, slot)
+            if response.status != 206:
+                offset = 0  # 服务器忽略了 Range 或资源已变化，从头下载
+
+            partial.begin(url, response.headers, offset)
+            partial.save()
+            if progress:
+                progress.start(partial.total_size, offset)
+
+            # 按偏移写入，不使用追加模式（O_APPEND 下 pwrite 会忽略偏移）
+            with open(partial.temp_path, 'r+b' if offset else 'wb', buffering=0) as f:
+                sink = self.writer.sink(f, offset)
+                try:
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        await sink.write(chunk)
+                        partial.downloaded += len(chunk)
+                        if progress:
+                            progress.update(len(chunk))
+                        if throttle:
+                            await throttle.consume(len(chunk))
+                    await sink.close()
+                except BaseException:
+                    # 保留已落盘部分供下次续传（包括 Ctrl+C 取消），截掉失败写入之后的内容
+                    partial.downloaded = sink.abort()
+                    f.truncate(partial.downloaded)
+                    partial.save()
+                    raise
+
+        partial.finish(output_path)
+        return partial.downloaded
+
+    async def _fetch_segmented(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        partial: PartialDownload,
+        resumable: bool,
+        progress: Optional[TransferProgress] = None,
+        throttle: Optional[TransferThrottle] = None,
+        slot: Optional[HostSlot] = None
+    ) -> Optional[int]:
+        """
+        分段并行下载到预分配的 .tmp 文件
+        返回: 文件大小；不满足分段条件时返回 None
+        """
+        target = url
+        if not resumable:
+            # 探测文件大小和 Range 支持情况
+            async with session.head(url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status >= 400:
+                    return None
+                if response.headers.get('Accept-Ranges', '').lower() != 'bytes':
+                    return None
+                partial.begin(url, response.headers)
+                target = str(response.url)  # 跳过重定向，各分段直接请求最终地址
+            if slot:
+                await slot.redirected(target)
+            if not partial.validator:
+                # 没有 ETag / Last-Modified 时无法用 If-Range 保证各分段来自同一版本，改为单连接下载
+                return None
+
+            count = min(self.segments, partial.total_size // self.min_segment_size)
+            if count < 2:
+                return None
+
+            step = partial.total_size // count
+            partial.segments = [
+                [i * step, partial.total_size - 1 if i == count - 1 else (i + 1) * step - 1, 0]
+                for i in range(count)
+            ]
+            with open(partial.temp_path, 'wb') as f:
+                self._preallocate(f, partial.total_size)
+            partial.save()
+
+        if progress:
+            progress.start(partial.total_size, sum(done for _, _, done in partial.segments))
+
+        with open(partial.temp_path, 'r+b', buffering=0) as f:
+            tasks = [
+                asyncio.ensure_future(self._fetch_range(session, target, partial, segment, f, progress, throttle, slot))
+                for segment in partial.segments
+                if segment[0] + segment[2] <= segment[1]
+            ]
+            try:
+                if tasks:
+                    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    for task in done:
+                        if task.exception():
+                            raise task.exception()
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                partial.downloaded = sum(done for _, _, done in partial.segments)
+                partial.save()
+                raise
+
+        return partial.total_size
+
+    async def _fetch_range(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        partial: PartialDownload,
+        segment: List[int],
+        f,
+        progress: Optional[TransferProgress] = None,
+        throttle: Optional[TransferThrottle] = None,
+        slot: Optional[HostSlot] = None
+    ):
+        """
+        下载一个分段并写入其在文件中的偏移位置
+        segment[2] 只计入已落盘的字节，失败后侧车据此续传
+        """
+        start, end, _ = segment
+        position = start + segment[2]
+
+        headers = {'Range': f'bytes={position}-{end}'}
+        if partial.validator:
+            headers['If-Range'] = partial.validator
+
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+            response.raise_for_status()
+            if slot:
+                await slot.redirected(response.url)  # 续传的分段请求原地址，逐个跟随重定向
+            if response.status != 206 or not self._range_matches(response, position):
+                raise RangeNotSupported(url)
+
+            sink = self.writer.sink(f, position)
+            try:
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    chunk = chunk[:end + 1 - position]
+                    await sink.write(chunk)
+                    position += len(chunk)
+                    partial.downloaded += len(chunk)
+                    if progress:
+                        progress.update(len(chunk))
+                    if throttle:
+                        await throttle.consume(len(chunk))
+                segment[2] = await sink.close() - start
+            except BaseException:
+                segment[2] = sink.abort() - start
+                raise
+
+        if position <= end:
+            raise aiohttp.ClientPayloadError(f"分段不完整: {position}/{end + 1}")
+
+    @staticmethod
+    def _preallocate(f, size: int):
+        """预分配文件空间，不支持时退回稀疏文件"""
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+                return
+            except OSError:
+                pass
+        f.truncate(size)
+
+    @staticmethod
+    def _range_matches(response: aiohttp.ClientResponse, offset: int) -> bool:
+        """检查 206 响应的 Content-Range 起点是否与请求一致"""
+        content_range = response.headers.get('Content-Range', '')
+        if not content_range.startswith('bytes '):
+            return False
+        start = content_range[len('bytes '):].split('-', 1)[0]
+        return start.isdigit() and int(start) == offset
+
+
+def transfer_options(func):
+    """为命令添加传输、缓存、下载清单和内容存储相关的命令行参数"""
+    options = [
+        click.option('--segments', type=int, default=1, help='单个文件的分段并行连接数（默认 1，不分段）'),
+        click.option('--min-segment-size', type=float, default=8, help='每个分段的最小大小 MB（默认 8）'),
+        click.option('--chunk-size', type=int, default=64, help='网络读取块大小 KB（默认 64）'),
+        click.option('--write-buffer', type=int, default=1024, help='合并写入磁盘的缓冲大小 KB（默认 1024）'),
+        click.option('--progress-fd', type=int, default=None,
+                     help='向该文件描述符输出 JSON lines 进度流（供任务调度器采集）'),
+        click.option('--cache-dir', type=click.Path(), default=None,
+                     help='RSS 和元数据缓存目录（默认 ~/.cache/casts_down）'),
+        click.option('--no-cache', is_flag=True, help='不使用 RSS 和元数据缓存'),
+        click.option('--manifest', type=click.Path(dir_okay=False), default=None,
+                     help='下载清单数据库路径（默认 ~/.local/share/casts_down/manifest.sqlite）'),
+        click.option('--no-manifest', is_flag=True, help='不使用下载清单，按文件名判断是否已存在'),
+        click.option('--store', type=click.Path(file_okay=False), default=None,
+                     help='内容寻址音频存储目录：相同音频只下载、只存一份，输出文件为指向它的硬链接'),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def create_transfer(params: dict, limiter: Optional[BandwidthLimiter] = None) -> tuple:
+    """
+    根据命令行参数创建传输引擎和下载清单（podcast_dl 和 xiaoyuzhou_dl 的 create_downloader 共用）
+    limiter 为批量模式共享的全局限速器，未传入时按参数创建
+    返回: (TransferEngine, DownloadManifest)；--no-manifest 时清单为 None
+    """
+    writer = DiskWriter(
+        buffer_size=int(params.get('write_buffer', 1024) * 1024),
+        workers=min(32, max(4, params.get('concurrent', 3)))
+    )
+    transfer = TransferEngine(
+        chunk_size=int(params.get('chunk_size', 64) * 1024),
+        segments=params.get('segments', 1),
+        min_segment_size=int(params.get('min_segment_size', 8) * 1024 * 1024),
+        writer=writer,
+        store=ContentStore(params['store']) if params.get('store') else None,
+        limiter=limiter or BandwidthLimiter.from_params(params)
+    )
+    manifest = None if params.get('no_manifest') else DownloadManifest(params.get('manifest'))
+    return transfer, manifest
+
+
+async def fetch_episode(
+    downloader,
+    session: aiohttp.ClientSession,
+    url: str,
+    output_path: Path,
+    skip_existing: bool = False,
+    podcast: str = '',
+    guid: Optional[str] = None
+) -> Tuple[str, Optional[int]]:
+    """
+    单集音频下载的公共流程（PodcastDownloader 和 XiaoyuzhouDownloader 共用）：
+    已下载则跳过 → 内容存储中已有则直接链接 → 占用主机并发额度按重试策略下载 → 记入清单
+    downloader 提供 manifest、transfer、scheduler、retry、progress 属性
+    返回: ('skipped' | 'linked' | 'downloaded', 文件大小)；跳过时大小为 None。
+    下载失败时抛出异常，由调用方转成各自的提示信息
+    """
+    manifest = downloader.manifest
+    if skip_existing:
+        if manifest:
+            if manifest.is_downloaded(podcast, guid, url, output_path):
+                return 'skipped', None
+        elif output_path.exists():
+            return 'skipped', None
+
+    # 内容寻址存储中已有同一音频时直接链接，不占用下载并发
+    size = await downloader.transfer.reuse(session, url, output_path)
+    if size is not None:
+        if manifest:
+            manifest.record(podcast, guid, url, output_path, size)
+        return 'linked', size
+
+    progress = downloader.progress.transfer(output_path.name)
+
+    async def attempt():
+        async with downloader.scheduler.slot(url) as slot:
+            size = await downloader.transfer.fetch(session, url, output_path, progress, slot)
+            slot.done(size)
+            return size
+
+    # 失败时保留 .tmp 和侧车，重试和下次运行都从已下载的位置续传
+    try:
+        with span('download', 'download', file=output_path.name):
+            size = await downloader.retry.call(attempt, output_path.name, notify=tqdm.write)
+    except BaseException:
+        progress.finish(False)
+        raise
+    progress.finish(True)
+    if manifest:
+        manifest.record(podcast, guid, url, output_path, size)
+    return 'downloaded', size
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+URL 列表读取
+casts_down 和 xiaoyuzhou_dl 共用的 URL 列表文件和 OPML 订阅导出解析
+"""
+
+from typing import List
+
+import click
+
+
+def read_url_file(path: str) -> List[str]:
+    """读取 URL 列表文件：每行一个，忽略空行和 # 注释"""
+    urls = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                urls.append(line)
+    return urls
+
+
+def read_opml(path: str) -> List[str]:
+    """从 OPML 订阅导出中提取所有 RSS 地址（outline 的 xmlUrl 属性）"""
+    from xml.etree import ElementTree
+
+    try:
+        tree = ElementTree.parse(path)
+    except ElementTree.ParseError as e:
+        raise click.BadParameter(f"OPML 解析失败: {e}", param_hint='--opml')
+    return [
+        outline.get('xmlUrl').strip()
+        for outline in tree.iter('outline')
+        if outline.get('xmlUrl')
+    ]
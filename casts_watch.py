@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+订阅监视（casts-down --watch）
+在一个常驻进程中按各自的节奏轮询订阅列表：轮询间隔由节目的历史发布频率估算并加入随机抖动，
+所有轮询和下载复用同一个 session，新出现的剧集直接交给 PodcastDownloader / XiaoyuzhouDownloader 下载
+"""
+
+import asyncio
+import email.utils
+import random
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import aiohttp
+import click
+
+
+# 每个平均发布间隔内轮询的次数
+POLLS_PER_GAP = 4
+# 估算发布频率时使用的最近发布数
+PUBLISH_SAMPLES = 10
+# 每次实际等待时间在间隔的 ±JITTER 范围内随机
+JITTER = 0.15
+# 每个订阅记住的已见剧集数上限
+SEEN_LIMIT = 1000
+# 订阅状态（已见剧集、当前间隔）的保存时间
+STATE_TTL = 365 * 86400
+
+
+def parse_published(value: str) -> Optional[float]:
+    """解析发布时间（RSS 的 RFC 822 或小宇宙的 ISO 8601），返回时间戳"""
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def estimate_interval(published: List[float], min_interval: float, max_interval: float,
+                      now: Optional[float] = None) -> float:
+    """
+    根据历史发布时间估算轮询间隔（秒）
+    取最近 PUBLISH_SAMPLES 次发布间隔的中位数，每个间隔内轮询 POLLS_PER_GAP 次；
+    距上次发布已远超平常间隔的节目（停更、季播）按已停更时长放慢轮询
+    """
+    if len(published) < 2:
+        return min_interval
+    now = time.time() if now is None else now
+    recent = sorted(published, reverse=True)[:PUBLISH_SAMPLES + 1]
+    gaps = [newer - older for newer, older in zip(recent, recent[1:]) if newer > older]
+    if not gaps:
+        return min_interval
+    expected = max(statistics.median(gaps), now - recent[0])
+    return min(max_interval, max(min_interval, expected / POLLS_PER_GAP))
+
+
+def jittered(interval: float) -> float:
+    return interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+
+def log(message: str):
+    """带时间戳输出，便于查看常驻进程的日志"""
+    click.echo(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}")
+
+
+def format_interval(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    return f"{minutes // 60}h{minutes % 60:02d}m" if minutes >= 60 else f"{minutes}m"
+
+
+class Subscription:
+    """一个订阅源的轮询状态"""
+
+    def __init__(self, url: str, platform: str, interval: float):
+        self.url = url
+        self.platform = platform            # 'podcast' 或 'xiaoyuzhou'
+        self.name = url
+        self.feed_url: Optional[str] = None  # Apple 播客主页解析出的 RSS 地址
+        self.interval = interval
+        self.seen: Optional[List[str]] = None   # 已见剧集（新的在前）；None 表示尚未建立基线
+
+
+class FeedWatcher:
+    """
+    常驻轮询调度器
+
+    每个订阅一个协程：首次轮询在启动后随机错开，之后按估算的间隔加抖动等待；
+    首次轮询只记录已有剧集并下载最新 latest 集（--all 时全部），之后只下载新出现的剧集。
+    已见剧集和间隔保存在元数据缓存中，重启后继续使用
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        downloaders: dict,
+        params: dict,
+        min_interval: float,
+        max_interval: float,
+        detect
+    ):
+        self.downloaders = downloaders      # {'podcast': PodcastDownloader, 'xiaoyuzhou': XiaoyuzhouDownloader}
+        self.params = params                # {'podcast': {...}, 'xiaoyuzhou': {...}}
+        # detect: URL → 'podcast' / 'xiaoyuzhou'（casts_down.detect_downloader）
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.subscriptions = [Subscription(url, detect(url), min_interval) for url in urls]
+        podcast_params = params['podcast']
+        # 与播客下载器共用缓存连接（--no-cache 时均为 None）
+        self.feed_cache = downloaders['podcast'].feed_cache
+        self.state = downloaders['podcast'].metadata_cache
+        # 同时进行的轮询数，下载并发由下载器共享的调度器控制
+        self._polls = asyncio.Semaphore(max(1, podcast_params.get('concurrent', 3)))
+
+    async def run(self, session: aiohttp.ClientSession):
+        """轮询所有订阅直到被取消"""
+        for sub in self.subscriptions:
+            self._load_state(sub)
+        log(f"[*] Watching {len(self.subscriptions)} subscription(s), "
+            f"polling every {format_interval(self.min_interval)} to {format_interval(self.max_interval)}")
+        await asyncio.gather(*(self._watch(session, sub) for sub in self.subscriptions))
+
+    async def _watch(self, session: aiohttp.ClientSession, sub: Subscription):
+        # 启动时把首次轮询随机分散开，避免所有订阅同时请求
+        await asyncio.sleep(random.uniform(0, min(60.0, self.min_interval)))
+        while True:
+            async with self._polls:
+                try:
+                    new = await self.poll(session, sub)
+                    if new:
+                        log(f"[+] {sub.name}: {new} new episode(s)")
+                except Exception as e:
+                    # 出错时加倍间隔，避免对故障源频繁请求
+                    sub.interval = min(self.max_interval, sub.interval * 2)
+                    log(f"[-] {sub.name}: {e}")
+            self._save_state(sub)
+            delay = jittered(sub.interval)
+            log(f"[*] Next poll of {sub.name} in {format_interval(delay)}")
+            await asyncio.sleep(delay)
+
+    async def poll(self, session: aiohttp.ClientSession, sub: Subscription) -> int:
+        """轮询一次，下载新剧集并更新间隔，返回新剧集数"""
+        if sub.platform == 'xiaoyuzhou':
+            name, episodes = await self._fetch_xiaoyuzhou(session, sub)
+        else:
+            name, episodes = await self._fetch_podcast(session, sub)
+        sub.name = name or sub.url
+
+        published = [t for t in (parse_published(published) for _, published, _ in episodes) if t]
+        sub.interval = estimate_interval(published, self.min_interval, self.max_interval)
+
+        first = sub.seen is None
+        if first:
+            # 首次轮询：已有剧集视为已见，只下载最新的 --latest 集（默认 1，--all 时全部）
+            latest = self.params[sub.platform].get('latest') or 1
+            selected = episodes if self.params['podcast'].get('all') else episodes[:latest]
+        else:
+            seen = set(sub.seen)
+            selected = [episode for episode in episodes if episode[0] not in seen]
+        # 下载失败的剧集不记为已见，下次轮询重试
+        results = []
+        if selected:
+            results = await self._download(session, sub, name, [payload for _, _, payload in selected])
+        failed = {key for (key, _, _), ok in zip(selected, results) if not ok}
+        keys = [key for key, _, _ in episodes if key not in failed]
+        sub.seen = list(dict.fromkeys(keys + (sub.seen or [])))[:SEEN_LIMIT]
+        return 0 if first else len(selected) - len(failed)
+
+    async def _fetch_podcast(self, session: aiohttp.ClientSession, sub: Subscription) -> tuple:
+        """RSS / Apple 播客主页：RSS 带 ETag 缓存，未更新时服务器返回 304"""
+        from podcast_dl import ApplePodcastsParser, RSSParser
+
+        if sub.feed_url is None:
+            sub.feed_url = sub.url
+            if 'podcasts.apple.com' in sub.url:
+                rss_url, _ = await ApplePodcastsParser.extract_metadata_async(session, sub.url, cache=self.state)
+                if not rss_url:
+                    sub.feed_url = None
+                    raise ValueError("Failed to extract RSS URL from Apple Podcasts")
+                sub.feed_url = rss_url
+
+        podcast_name, episodes = await RSSParser.parse_async(session, sub.feed_url, cache=self.feed_cache)
+        return podcast_name, [(e.guid or e.audio_url, e.published, e) for e in episodes]
+
+    async def _fetch_xiaoyuzhou(self, session: aiohttp.ClientSession, sub: Subscription) -> tuple:
+        podcast_name, episodes = await self.downloaders['xiaoyuzhou'].get_podcast_episodes(
+            session, sub.url, self.state, quiet=True
+        )
+        return podcast_name, [(e.get('eid') or e['enclosure']['url'], e.get('pubDate', ''), e) for e in episodes]
+
+    async def _download(
+        self, session: aiohttp.ClientSession, sub: Subscription, name: str, episodes: list
+    ) -> List[bool]:
+        """交给对应下载器，返回每集是否成功；清单判断已下载的剧集，重复推送不会重复下载"""
+        params = self.params[sub.platform]
+        downloader = self.downloaders[sub.platform]
+        if sub.platform == 'xiaoyuzhou':
+            output_dir = Path(params.get('output', './xiaoyuzhou_downloads'))
+            return await downloader.download_episodes(session, name, episodes, output_dir, skip_existing=True)
+        output_dir = Path(params.get('output', './podcasts'))
+        return await downloader.download_all(episodes, name, output_dir, skip_existing=True, session=session)
+
+    def _load_state(self, sub: Subscription):
+        saved = self.state.get('watch', sub.url) if self.state else None
+        if saved:
+            sub.seen = saved.get('seen')
+            sub.interval = min(self.max_interval, max(self.min_interval, saved.get('interval', self.min_interval)))
+            sub.name = saved.get('name') or sub.url
+
+    def _save_state(self, sub: Subscription):
+        if self.state and sub.seen is not None:
+            self.state.set('watch', sub.url, {'seen': sub.seen, 'interval': sub.interval, 'name': sub.name},
+                           ttl=STATE_TTL)
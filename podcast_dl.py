@@ -5,26 +5,49 @@ Podcast Downloader CLI Tool
 """
 
 import asyncio
+import html
 import re
 import sys
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from urllib.parse import urlparse
+from xml.etree import ElementTree
 
 import aiohttp
 import click
-import feedparser
-import requests
-from bs4 import BeautifulSoup
 from tqdm import tqdm
 
+from casts_cache import ACCEPT_ENCODING, FeedCache, MetadataCache
+from casts_manifest import DownloadManifest
+from casts_net import ConnectionConfig, connection_options
+from casts_profile import profile_options, profiling, span
+from casts_progress import ProgressTracker
+from casts_ratelimit import BandwidthLimiter, ratelimit_options
+from casts_retry import RetryPolicy, retry_options
+from casts_scheduler import HostScheduler
+from casts_transfer import TransferEngine, create_transfer, fetch_episode, transfer_options
+
+# feedparser 和 bs4 导入较慢，只在完整解析 RSS、解析 Apple 页面时才导入，
+# 流式解析 RSS 和小宇宙链接的运行不加载它们
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+# Apple Podcasts 页面解析
+HEAD_END = re.compile(rb'</head\s*>', re.IGNORECASE)
+RSS_LINK = re.compile(r'https?://.*\.rss')
+ANCHOR_HREF = re.compile(rb'<a\s[^>]*?href\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+ITUNES_LOOKUP_BATCH = 100  # 单次 lookup 请求携带的最多 ID 数
+
 
 class PodcastEpisode:
     """播客剧集数据类"""
-    def __init__(self, title: str, audio_url: str, published: str = ""):
+    def __init__(self, title: str, audio_url: str, published: str = "", guid: str = ""):
         self.title = title
         self.audio_url = audio_url
         self.published = published
+        self.guid = guid
 
     def sanitize_filename(self, podcast_name: str) -> str:
         """生成安全的文件名"""
@@ -45,72 +68,324 @@ class PodcastEpisode:
 class RSSParser:
     """RSS 解析器"""
 
+    USER_AGENT = 'Mozilla/5.0 (compatible; casts_down; +https://github.com/clemente0731/casts_down)'
+
     @staticmethod
-    def parse(rss_url: str, episode_title: Optional[str] = None) -> tuple[str, List[PodcastEpisode]]:
+    def parse(
+        rss_url: str,
+        episode_title: Optional[str] = None,
+        cache: Optional[FeedCache] = None,
+        limit: Optional[int] = None
+    ) -> tuple[str, List[PodcastEpisode]]:
         """
-        解析 RSS 源
+        解析 RSS 源（同步封装，内部使用 parse_async）
         返回: (播客名称, 剧集列表)
 
         参数:
             rss_url: RSS 源地址
             episode_title: 可选的单集标题，如果提供则只返回匹配的剧集
+            cache: 可选的源缓存，命中 304 时复用上次的解析结果
+            limit: 可选，只需要最新 N 集时读到第 N 集即停止
         """
-        try:
-            feed = feedparser.parse(rss_url)
+        async def run():
+            async with aiohttp.ClientSession() as session:
+                return await RSSParser.parse_async(session, rss_url, episode_title, cache, limit=limit)
 
-            if feed.bozo:  # 解析错误
-                raise ValueError(f"RSS 解析失败: {feed.bozo_exception}")
+        return asyncio.run(run())
 
-            podcast_name = feed.feed.get('title', 'Unknown Podcast')
-            episodes = []
+    @staticmethod
+    async def parse_async(
+        session: aiohttp.ClientSession,
+        rss_url: str,
+        episode_title: Optional[str] = None,
+        cache: Optional[FeedCache] = None,
+        executor: Optional[Executor] = None,
+        limit: Optional[int] = None
+    ) -> tuple[str, List[PodcastEpisode]]:
+        """
+        异步解析 RSS 源：通过共享 session 下载，feedparser 解析放到执行器中运行
+        返回: (播客名称, 剧集列表)
 
-            for entry in feed.entries:
-                # 查找音频链接
-                audio_url = None
+        指定 limit 或 episode_title 时改用流式解析，
+        找够 limit 集或匹配到标题后立即停止读取
 
-                # 方式1: enclosures
-                if hasattr(entry, 'enclosures') and entry.enclosures:
-                    for enc in entry.enclosures:
-                        if 'audio' in enc.get('type', ''):
-                            audio_url = enc.get('href')
-                            break
-
-                # 方式2: links
-                if not audio_url and hasattr(entry, 'links'):
-                    for link in entry.links:
-                        if link.get('type', '').startswith('audio'):
-                            audio_url = link.get('href')
-                            break
-
-                if audio_url:
-                    episode = PodcastEpisode(
-                        title=entry.get('title', 'Untitled'),
-                        audio_url=audio_url,
-                        published=entry.get('published', '')
+        参数:
+            session: 与 Apple 元数据、音频下载共用的 aiohttp 会话
+            executor: 解析使用的线程池/进程池，默认使用事件循环的线程池
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            if not rss_url.startswith(('http://', 'https://')):
+                # 本地文件等非 HTTP 源直接交给 feedparser
+                podcast_name, episodes = await loop.run_in_executor(executor, RSSParser.parse_document, rss_url)
+                return RSSParser._select(podcast_name, episodes, episode_title)
+
+            streaming = bool(limit or episode_title)
+            entry = cache.get(rss_url) if cache else None
+            if entry and not RSSParser._cache_covers(entry['parsed'], limit):
+                entry = None  # 缓存的只是部分结果且不够用，发起无条件请求
+
+            while True:
+                headers = {'User-Agent': RSSParser.USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING}
+                headers.update(FeedCache.conditional_headers(entry))
+
+                async with session.get(rss_url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    if response.status == 304 and entry:
+                        cache.touch(rss_url, entry)
+                        result = RSSParser._select_cached(entry['parsed'], episode_title)
+                        if result is not None:
+                            return result
+                        entry = None  # 部分缓存中没有目标单集，重新请求
+                        continue
+
+                    response.raise_for_status()
+
+                    if streaming:
+                        stream = RSSStreamParser(limit=limit, episode_title=episode_title)
+                        try:
+                            async for chunk in response.content.iter_chunked(65536):
+                                with span('rss.stream_parse', 'parse'):
+                                    found = stream.feed(chunk)
+                                if found:
+                                    break  # 已找到所需剧集，不再读取剩余内容
+                            else:
+                                stream.close()
+                        except ElementTree.ParseError:
+                            # 不是严格的 XML（如未声明的 HTML 实体），回退到 feedparser
+                            streaming = False
+                            entry = None
+                            continue
+
+                        if cache and not episode_title:
+                            cache.store(rss_url, response.headers, RSSParser.to_cached(
+                                stream.podcast_name, stream.episodes, complete=stream.complete
+                            ))
+                        return stream.podcast_name, stream.episodes
+
+                    body = await response.read()
+                    podcast_name, episodes = await loop.run_in_executor(
+                        executor, RSSParser.parse_document, body
                     )
+                    if cache:
+                        cache.store(rss_url, response.headers, RSSParser.to_cached(podcast_name, episodes))
+                    return RSSParser._select(podcast_name, episodes, episode_title)
+
+        except Exception as e:
+            raise ValueError(f"RSS 解析错误: {str(e)}")
+
+    @staticmethod
+    def parse_document(source) -> tuple[str, List[PodcastEpisode]]:
+        """
+        用 feedparser 解析 RSS 文档（正文字节或本地路径）
+        返回完整的剧集列表
+        """
+        import feedparser
+
+        with span('rss.feedparser', 'parse'):
+            feed = feedparser.parse(source)
+
+        # 解析错误：feedparser 对不严格的 XML（如未声明的 HTML 实体）会改用宽松解析，
+        # 仍取到了条目时照常使用，这也是流式解析失败后的回退路径
+        if feed.bozo and not feed.entries:
+            raise ValueError(f"RSS 解析失败: {feed.bozo_exception}")
+
+        podcast_name = feed.feed.get('title', 'Unknown Podcast')
+        episodes = []
+
+        for entry in feed.entries:
+            # 查找音频链接
+            audio_url = None
+
+            # 方式1: enclosures
+            if hasattr(entry, 'enclosures') and entry.enclosures:
+                for enc in entry.enclosures:
+                    if 'audio' in enc.get('type', ''):
+                        audio_url = enc.get('href')
+                        break
+
+            # 方式2: links
+            if not audio_url and hasattr(entry, 'links'):
+                for link in entry.links:
+                    if link.get('type', '').startswith('audio'):
+                        audio_url = link.get('href')
+                        break
+
+            if audio_url:
+                episodes.append(PodcastEpisode(
+                    title=entry.get('title', 'Untitled'),
+                    audio_url=audio_url,
+                    published=entry.get('published', ''),
+                    guid=entry.get('id', '')
+                ))
+
+        return podcast_name, episodes
 
-                    # 如果指定了单集标题，检查是否匹配
-                    if episode_title:
-                        # 清理标题进行模糊匹配
-                        rss_title = episode.title.strip().lower()
-                        target_title = episode_title.strip().lower()
+    @staticmethod
+    def title_matches(podcast_name: str, rss_title: str, episode_title: str) -> bool:
+        """标题模糊匹配：去掉播客名称后互相包含即视为同一集"""
+        # 清理标题进行模糊匹配
+        rss_title = rss_title.strip().lower()
+        target_title = episode_title.strip().lower()
 
-                        # 移除播客名称（可能在 Apple Podcasts 标题中）
-                        podcast_name_lower = podcast_name.lower()
-                        target_title = target_title.replace(podcast_name_lower, '').strip()
-                        target_title = target_title.lstrip(':：- ')
+        # 移除播客名称（可能在 Apple Podcasts 标题中）
+        target_title = target_title.replace(podcast_name.lower(), '').strip()
+        target_title = target_title.lstrip(':：- ')
 
-                        # 检查标题是否匹配（包含或被包含）
-                        if target_title in rss_title or rss_title in target_title:
-                            episodes = [episode]  # 只保留匹配的剧集
-                            break
-                    else:
-                        episodes.append(episode)
+        # 检查标题是否匹配（包含或被包含）
+        return target_title in rss_title or rss_title in target_title
 
-            return podcast_name, episodes
+    @staticmethod
+    def match_title(podcast_name: str, episodes: List[PodcastEpisode], episode_title: str) -> List[PodcastEpisode]:
+        """按标题模糊匹配单集，返回 [匹配剧集] 或空列表"""
+        for episode in episodes:
+            if RSSParser.title_matches(podcast_name, episode.title, episode_title):
+                return [episode]  # 只保留匹配的剧集
+        return []
 
-        except Exception as e:
-            raise ValueError(f"RSS 解析错误: {str(e)}")
+    @staticmethod
+    def _select(podcast_name: str, episodes: List[PodcastEpisode], episode_title: Optional[str]):
+        """指定标题时只保留匹配的剧集"""
+        if episode_title:
+            episodes = RSSParser.match_title(podcast_name, episodes, episode_title)
+        return podcast_name, episodes
+
+    @staticmethod
+    def _cache_covers(parsed: dict, limit: Optional[int]) -> bool:
+        """缓存结果是否足以回答本次请求（完整结果，或部分结果已包含前 limit 集）"""
+        if parsed.get('complete', True):
+            return True
+        return bool(limit) and len(parsed['episodes']) >= limit
+
+    @staticmethod
+    def _select_cached(parsed: dict, episode_title: Optional[str]):
+        """从缓存取结果；部分缓存中找不到目标单集时返回 None"""
+        podcast_name, episodes = RSSParser._select(*RSSParser.from_cached(parsed), episode_title)
+        if episode_title and not episodes and not parsed.get('complete', True):
+            return None
+        return podcast_name, episodes
+
+    @staticmethod
+    def to_cached(podcast_name: str, episodes: List[PodcastEpisode], complete: bool = True) -> dict:
+        """解析结果转换为可写入缓存的 JSON 结构；complete=False 表示只读取了源的前一部分"""
+        return {
+            'podcast_name': podcast_name,
+            'complete': complete,
+            'episodes': [
+                {'title': ep.title, 'audio_url': ep.audio_url, 'published': ep.published, 'guid': ep.guid}
+                for ep in episodes
+            ],
+        }
+
+    @staticmethod
+    def from_cached(parsed: dict) -> tuple[str, List[PodcastEpisode]]:
+        """从缓存的 JSON 结构还原解析结果"""
+        episodes = [PodcastEpisode(**item) for item in parsed['episodes']]
+        return parsed['podcast_name'], episodes
+
+
+class RSSStreamParser:
+    """
+    增量 RSS/Atom 解析器
+
+    边读取边产出剧集，每个 <item>/<entry> 解析完即从树中移除，
+    内存中不保留完整 DOM；满足 limit 或匹配到标题后 feed() 返回 True
+    """
+
+    ATOM_NS = 'http://www.w3.org/2005/Atom'
+
+    def __init__(self, limit: Optional[int] = None, episode_title: Optional[str] = None):
+        self.limit = limit
+        self.episode_title = episode_title
+        self.podcast_name = None
+        self.episodes: List[PodcastEpisode] = []
+        self.complete = False  # 是否读完了整个文档
+        self._parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        self._stack = []
+
+    def feed(self, data: bytes) -> bool:
+        """输入一段数据，返回是否已经找到所需的剧集"""
+        self._parser.feed(data)
+        return self._process_events()
+
+    def close(self) -> bool:
+        """文档读取完毕"""
+        self._parser.close()
+        done = self._process_events()
+        self.complete = True
+        return done
+
+    def _process_events(self) -> bool:
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                self._stack.append(elem)
+                continue
+
+            self._stack.pop()
+            namespace, tag = self._split_tag(elem.tag)
+
+            if tag in ('item', 'entry'):
+                if self._stack:
+                    self._stack[-1].remove(elem)  # 释放已处理的条目
+                if self._accept(self._build_episode(elem)):
+                    return True
+            elif (tag == 'title' and self.podcast_name is None and self._stack
+                  and self._split_tag(self._stack[-1].tag)[1] in ('channel', 'feed')):
+                self.podcast_name = (elem.text or '').strip() or 'Unknown Podcast'
+
+        return False
+
+    def _accept(self, episode: Optional[PodcastEpisode]) -> bool:
+        """记录剧集，返回是否可以停止"""
+        if episode is None:
+            return False
+        if self.episode_title:
+            podcast_name = self.podcast_name or ''
+            if RSSParser.title_matches(podcast_name, episode.title, self.episode_title):
+                self.episodes = [episode]
+                return True
+            return False
+        self.episodes.append(episode)
+        return bool(self.limit) and len(self.episodes) >= self.limit
+
+    def _build_episode(self, item) -> Optional[PodcastEpisode]:
+        """从 <item>/<entry> 元素构建剧集，没有音频链接时返回 None"""
+        title = None
+        audio_url = None
+        link_url = None
+        published = ''
+        guid = ''
+
+        for child in item:
+            namespace, tag = self._split_tag(child.tag)
+            if namespace not in ('', self.ATOM_NS):
+                continue  # 忽略 itunes:title 等扩展元素
+            if tag == 'title':
+                title = (child.text or '').strip()
+            elif tag == 'enclosure' and not audio_url:
+                # 方式1: enclosures
+                if 'audio' in child.get('type', ''):
+                    audio_url = child.get('url') or child.get('href')
+            elif tag == 'link' and not link_url:
+                # 方式2: links（Atom）
+                if child.get('type', '').startswith('audio'):
+                    link_url = child.get('href')
+            elif tag in ('pubDate', 'published') and not published:
+                published = (child.text or '').strip()
+            elif tag in ('guid', 'id') and not guid:
+                guid = (child.text or '').strip()
+
+        audio_url = audio_url or link_url
+        if not audio_url:
+            return None
+        return PodcastEpisode(title=title or 'Untitled', audio_url=audio_url, published=published, guid=guid)
+
+    @staticmethod
+    def _split_tag(tag: str) -> tuple[str, str]:
+        """'{ns}local' -> (ns, local)"""
+        if tag.startswith('{'):
+            namespace, _, local = tag[1:].partition('}')
+            return namespace, local
+        return '', tag
 
 
 class ApplePodcastsParser:
@@ -126,238 +401,589 @@ class ApplePodcastsParser:
         return match.group(1) if match else None
 
     @staticmethod
-    async def extract_metadata_async(session: aiohttp.ClientSession, apple_url: str) -> tuple[Optional[str], Optional[str]]:
+    def extract_podcast_id(apple_url: str) -> Optional[str]:
+        """
+        从 Apple Podcasts URL 提取播客 ID
+        例如: /id1200361736 -> 1200361736
+        """
+        match = re.search(r'/id(\d+)', apple_url)
+        return match.group(1) if match else None
+
+    @staticmethod
+    async def lookup_episode(
+        session: aiohttp.ClientSession,
+        apple_url: str,
+        episode_id: str,
+        cache: Optional[MetadataCache] = None
+    ) -> Optional[dict]:
+        """
+        通过 iTunes lookup 接口按单集 ID 直接解析音频地址和 GUID
+        返回: {'podcast_name', 'feed_url', 'title', 'audio_url', 'guid', 'published'}，
+        找不到时返回 None（lookup 只返回最近约 200 集）
+
+        一次请求会缓存该播客返回的所有单集，同一节目的其他单集无需再次请求
+        """
+        if cache:
+            cached = cache.get('apple_episode', episode_id)
+            if cached:
+                return cached
+
+        podcast_id = ApplePodcastsParser.extract_podcast_id(apple_url)
+        if not podcast_id:
+            return None
+
+        api_url = (f"https://itunes.apple.com/lookup?id={podcast_id}"
+                   f"&media=podcast&entity=podcastEpisode&limit=200")
+        try:
+            async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)  # 接口返回 text/javascript
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+
+        results = data.get('results', [])
+        feed_url = next((r.get('feedUrl') for r in results if r.get('kind') == 'podcast'), None)
+
+        episodes = {}
+        for result in results:
+            if result.get('wrapperType') != 'podcastEpisode' or not result.get('episodeUrl'):
+                continue
+            episodes[str(result['trackId'])] = {
+                'podcast_name': result.get('collectionName', 'Unknown Podcast'),
+                'feed_url': result.get('feedUrl') or feed_url,
+                'title': result.get('trackName', 'Untitled'),
+                'audio_url': result['episodeUrl'],
+                'guid': result.get('episodeGuid', ''),
+                'published': result.get('releaseDate', ''),
+            }
+
+        if cache:
+            cache.set_many('apple_episode', episodes)
+            if feed_url:
+                cache.set('apple_podcast', podcast_id, {
+                    'feed_url': feed_url,
+                    'podcast_name': next((r.get('collectionName', '') for r in results
+                                          if r.get('kind') == 'podcast'), ''),
+                })
+        return episodes.get(episode_id)
+
+    @staticmethod
+    async def lookup_feed_url(
+        session: aiohttp.ClientSession,
+        podcast_id: str,
+        cache: Optional[MetadataCache] = None
+    ) -> Optional[str]:
+        """通过 iTunes lookup 接口按播客 ID 查询 RSS 地址（结果缓存在 apple_podcast 命名空间）"""
+        feeds = await ApplePodcastsParser.lookup_feed_urls(session, [podcast_id], cache)
+        return feeds.get(podcast_id)
+
+    @staticmethod
+    async def lookup_feed_urls(
+        session: aiohttp.ClientSession,
+        podcast_ids: List[str],
+        cache: Optional[MetadataCache] = None
+    ) -> dict:
+        """
+        批量查询播客 ID → RSS 地址
+        未缓存的 ID 按每批 ITUNES_LOOKUP_BATCH 个用逗号拼接成一次 lookup 请求，
+        N 个播客只需约 N/100 次往返；查询失败的批次直接跳过
+        """
+        feeds = {}
+        missing = []
+        for podcast_id in dict.fromkeys(podcast_ids):
+            cached = cache.get('apple_podcast', podcast_id) if cache else None
+            if cached:
+                feeds[podcast_id] = cached['feed_url']
+            else:
+                missing.append(podcast_id)
+
+        for start in range(0, len(missing), ITUNES_LOOKUP_BATCH):
+            batch = missing[start:start + ITUNES_LOOKUP_BATCH]
+            api_url = f"https://itunes.apple.com/lookup?id={','.join(batch)}&entity=podcast"
+            try:
+                async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)  # 接口返回 text/javascript
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                continue
+
+            entries = {}
+            for result in data.get('results', []):
+                podcast_id = str(result.get('collectionId') or result.get('trackId') or '')
+                if podcast_id in batch and result.get('feedUrl'):
+                    feeds[podcast_id] = result['feedUrl']
+                    entries[podcast_id] = {
+                        'feed_url': result['feedUrl'],
+                        'podcast_name': result.get('collectionName', ''),
+                    }
+            if cache:
+                cache.set_many('apple_podcast', entries)
+
+        return feeds
+
+    @staticmethod
+    def page_cache_key(apple_url: str) -> str:
+        """页面元数据的缓存键：播客 ID + 单集 ID，不同地区 / slug 的同一页面共用一条缓存"""
+        podcast_id = ApplePodcastsParser.extract_podcast_id(apple_url)
+        if not podcast_id:
+            return apple_url
+        episode_id = ApplePodcastsParser.extract_episode_id(apple_url)
+        return f"{podcast_id}?i={episode_id}" if episode_id else podcast_id
+
+    @staticmethod
+    async def extract_metadata_async(
+        session: aiohttp.ClientSession,
+        apple_url: str,
+        cache: Optional[MetadataCache] = None
+    ) -> tuple[Optional[str], Optional[str]]:
         """
         异步一次性从 Apple Podcasts 页面提取 RSS URL 和标题
         返回: (rss_url, episode_title)
 
         性能优化：合并原来的 extract_episode_title() 和 extract_rss_url()，
-        避免对同一 URL 发送多次请求
+        避免对同一 URL 发送多次请求；只流式读取到 </head> 并用 SoupStrainer 解析其中的
+        meta/title，头部没有 og:audio 时才读取正文查找 RSS 链接，仍然一无所获时才完整解析。
+        传入 cache 时页面结果和播客 ID → RSS 地址都会缓存，重复运行无需任何请求
         """
+        if cache:
+            cached = cache.get('apple_page', ApplePodcastsParser.page_cache_key(apple_url))
+            if cached:
+                return cached['rss_url'], cached['title']
+            # 播客主页只需要 RSS 地址，批量 lookup 预取过的直接使用（没有单集标题）
+            podcast_id = ApplePodcastsParser.extract_podcast_id(apple_url)
+            if podcast_id and not ApplePodcastsParser.extract_episode_id(apple_url):
+                cached = cache.get('apple_podcast', podcast_id)
+                if cached:
+                    return cached['feed_url'], None
+
+        rss_url, episode_title = await ApplePodcastsParser._fetch_metadata(session, apple_url, cache)
+        if cache and rss_url:
+            cache.set('apple_page', ApplePodcastsParser.page_cache_key(apple_url),
+                      {'rss_url': rss_url, 'title': episode_title})
+        return rss_url, episode_title
+
+    @staticmethod
+    async def _fetch_metadata(
+        session: aiohttp.ClientSession,
+        apple_url: str,
+        cache: Optional[MetadataCache] = None
+    ) -> tuple[Optional[str], Optional[str]]:
+        """抓取并解析页面，必要时查询 iTunes 接口"""
+        from bs4 import BeautifulSoup, SoupStrainer
+
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
             async with session.get(apple_url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
                 response.raise_for_status()
-                content = await response.text()
-                soup = BeautifulSoup(content, 'html.parser')
-
-                # 提取标题
-                episode_title = None
-                title_meta = soup.find('meta', {'property': 'og:title'})
-                if title_meta and title_meta.get('content'):
-                    episode_title = title_meta['content']
-                elif title_tag := soup.find('title'):
-                    episode_title = title_tag.text.strip()
-
-                # 提取 RSS URL
-                rss_url = None
-
-                # 方式1: 查找 feed URL meta 标签
-                feed_meta = soup.find('meta', {'property': 'og:audio'})
-                if feed_meta and feed_meta.get('content'):
-                    rss_url = feed_meta['content']
-
-                # 方式2: 查找页面中的 RSS 链接
+                content, head_end = await ApplePodcastsParser.read_head(response)
+
+                episode_title = rss_url = None
+                if head_end is not None:
+                    with span('apple.parse_head', 'parse'):
+                        head = BeautifulSoup(bytes(content[:head_end]), 'html.parser',
+                                             parse_only=SoupStrainer(['meta', 'title']), from_encoding=response.charset)
+                        episode_title, rss_url = ApplePodcastsParser.page_metadata(head)
+
                 if not rss_url:
-                    rss_link = soup.find('a', href=re.compile(r'https?://.*\.rss'))
-                    if rss_link:
-                        rss_url = rss_link['href']
+                    # 头部没有 og:audio，读完页面查找正文中的 RSS 链接
+                    content += await response.read()
+                    with span('apple.parse_body', 'parse'):
+                        if episode_title:
+                            rss_url = ApplePodcastsParser.find_rss_link(content)
+                        else:
+                            soup = BeautifulSoup(bytes(content), 'html.parser', from_encoding=response.charset)
+                            episode_title, rss_url = ApplePodcastsParser.page_metadata(soup)
 
                 # 方式3: 使用 iTunes API（仅在前两种方式失败时）
                 if not rss_url:
-                    podcast_id = re.search(r'/id(\d+)', apple_url)
+                    podcast_id = ApplePodcastsParser.extract_podcast_id(apple_url)
                     if podcast_id:
-                        api_url = f"https://itunes.apple.com/lookup?id={podcast_id.group(1)}&entity=podcast"
-                        async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=10)) as api_response:
-                            data = await api_response.json()
-                            if data.get('resultCount', 0) > 0:
-                                rss_url = data['results'][0].get('feedUrl')
+                        rss_url = await ApplePodcastsParser.lookup_feed_url(session, podcast_id, cache)
 
                 return rss_url, episode_title
 
-        except Exception as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             return None, None
 
     @staticmethod
-    def extract_episode_title(apple_url: str) -> Optional[str]:
+    async def read_head(response: aiohttp.ClientResponse) -> tuple[bytearray, Optional[int]]:
         """
-        从 Apple Podcasts 单集页面提取剧集标题
-
-        已弃用：请使用 extract_metadata_async() 以获得更好的性能
+        流式读取页面直到 </head>
+        返回: (已读取的内容, </head> 结束位置)；整页都没有 </head> 时位置为 None
         """
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            response = requests.get(apple_url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            # 确保正确的编码
-            response.encoding = response.apparent_encoding or 'utf-8'
+        content = bytearray()
+        async for chunk in response.content.iter_chunked(16 * 1024):
+            start = max(0, len(content) - 16)  # 结束标签可能被数据块截断
+            content += chunk
+            match = HEAD_END.search(content, start)
+            if match:
+                return content, match.end()
+        return content, None
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+    @staticmethod
+    def find_rss_link(content: bytes) -> Optional[str]:
+        """只扫描 <a> 标签的 href，返回第一个 RSS 链接（不构建整页文档树）"""
+        for match in ANCHOR_HREF.finditer(content):
+            href = html.unescape(match.group(1).decode('utf-8', 'replace'))
+            if RSS_LINK.search(href):
+                return href
+        return None
 
-            # 方式1: 查找 og:title
-            title_meta = soup.find('meta', {'property': 'og:title'})
-            if title_meta and title_meta.get('content'):
-                return title_meta['content']
+    @staticmethod
+    def page_metadata(soup: 'BeautifulSoup') -> tuple[Optional[str], Optional[str]]:
+        """从解析后的页面提取 (标题, RSS URL)"""
+        # 提取标题
+        episode_title = None
+        title_meta = soup.find('meta', {'property': 'og:title'})
+        if title_meta and title_meta.get('content'):
+            episode_title = title_meta['content']
+        elif title_tag := soup.find('title'):
+            episode_title = title_tag.text.strip()
+
+        # 提取 RSS URL
+        rss_url = None
+
+        # 方式1: 查找 feed URL meta 标签
+        feed_meta = soup.find('meta', {'property': 'og:audio'})
+        if feed_meta and feed_meta.get('content'):
+            rss_url = feed_meta['content']
+
+        # 方式2: 查找页面中的 RSS 链接
+        if not rss_url:
+            rss_link = soup.find('a', href=RSS_LINK)
+            if rss_link:
+                rss_url = rss_link['href']
 
-            # 方式2: 查找页面标题
-            title_tag = soup.find('title')
-            if title_tag:
-                return title_tag.text.strip()
+        return episode_title, rss_url
 
-            return None
+    @staticmethod
+    def extract_episode_title(apple_url: str) -> Optional[str]:
+        """
+        从 Apple Podcasts 单集页面提取剧集标题（同步封装）
 
-        except Exception:
-            return None
+        已弃用：请使用 extract_metadata_async() 以获得更好的性能
+        """
+        _, episode_title = ApplePodcastsParser._extract_metadata_sync(apple_url)
+        return episode_title
 
     @staticmethod
     def extract_rss_url(apple_url: str) -> str:
         """
-        从 Apple Podcasts 页面提取 RSS URL
-        """
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            response = requests.get(apple_url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 方式1: 查找 feed URL meta 标签
-            feed_meta = soup.find('meta', {'property': 'og:audio'})
-            if feed_meta and feed_meta.get('content'):
-                return feed_meta['content']
-
-            # 方式2: 查找页面中的 RSS 链接
-            rss_link = soup.find('a', href=re.compile(r'https?://.*\.rss'))
-            if rss_link:
-                return rss_link['href']
-
-            # 方式3: 使用 iTunes API
-            podcast_id = re.search(r'/id(\d+)', apple_url)
-            if podcast_id:
-                api_url = f"https://itunes.apple.com/lookup?id={podcast_id.group(1)}&entity=podcast"
-                api_response = requests.get(api_url, timeout=10)
-                data = api_response.json()
-
-                if data['resultCount'] > 0:
-                    feed_url = data['results'][0].get('feedUrl')
-                    if feed_url:
-                        return feed_url
+        从 Apple Podcasts 页面提取 RSS URL（同步封装）
 
+        已弃用：请使用 extract_metadata_async() 以获得更好的性能
+        """
+        rss_url, _ = ApplePodcastsParser._extract_metadata_sync(apple_url)
+        if not rss_url:
             raise ValueError("无法从 Apple Podcasts 页面提取 RSS URL")
+        return rss_url
+
+    @staticmethod
+    def _extract_metadata_sync(apple_url: str) -> tuple[Optional[str], Optional[str]]:
+        async def run():
+            async with aiohttp.ClientSession() as session:
+                return await ApplePodcastsParser.extract_metadata_async(session, apple_url)
 
-        except requests.RequestException as e:
-            raise ValueError(f"请求 Apple Podcasts 失败: {str(e)}")
+        return asyncio.run(run())
 
 
 class PodcastDownloader:
     """异步下载器"""
 
-    def __init__(self, concurrent: int = 3):
+    def __init__(
+        self,
+        concurrent: int = 3,
+        transfer: Optional[TransferEngine] = None,
+        scheduler: Optional[HostScheduler] = None,
+        manifest: Optional[DownloadManifest] = None,
+        retry: Optional[RetryPolicy] = None,
+        progress: Optional[ProgressTracker] = None,
+        feed_cache: Optional[FeedCache] = None,
+        metadata_cache: Optional[MetadataCache] = None
+    ):
         self.concurrent = concurrent
-        self.semaphore = asyncio.Semaphore(concurrent)
+        # 按主机自适应的并发调度，传入 scheduler 时与其他下载器共享同一个全局上限
+        self.scheduler = scheduler or HostScheduler(concurrent)
+        self.transfer = transfer or TransferEngine()
+        self.manifest = manifest
+        self.retry = retry or RetryPolicy()
+        self.progress = progress or ProgressTracker()
+        # 缓存在整个运行期间共用一个连接，处理多个源时不重复打开
+        self.feed_cache = feed_cache
+        self.metadata_cache = metadata_cache
+
+    def close(self):
+        """关闭下载清单、内容存储和元数据缓存的数据库连接"""
+        if self.manifest:
+            self.manifest.close()
+        if self.transfer.store:
+            self.transfer.store.close()
+        if self.metadata_cache:
+            self.metadata_cache.close()
 
     async def download_episode(
         self,
         session: aiohttp.ClientSession,
         episode: PodcastEpisode,
         output_path: Path,
-        skip_existing: bool = False
+        skip_existing: bool = False,
+        podcast_name: str = ''
     ) -> tuple[bool, str]:
         """
         下载单个剧集（带资源清理和详细错误处理）
         返回: (是否成功, 消息)
         """
-        async with self.semaphore:
-            temp_path = None
-            try:
-                if output_path.exists() and skip_existing:
-                    return True, f"跳过: {output_path.name}"
-
-                async with session.get(episode.audio_url, timeout=aiohttp.ClientTimeout(total=3600)) as response:
-                    response.raise_for_status()
-
-                    total_size = int(response.headers.get('content-length', 0))
-
-                    # 创建临时文件
-                    temp_path = output_path.with_suffix(output_path.suffix + '.tmp')
-
-                    with open(temp_path, 'wb') as f:
-                        downloaded = 0
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                            downloaded += len(chunk)
-
-                    # 下载完成后安全重命名
-                    if output_path.exists():
-                        output_path.unlink()  # 删除已存在的文件
-                    temp_path.rename(output_path)
-                    temp_path = None  # 标记已成功重命名
-
-                    size_mb = output_path.stat().st_size / 1024 / 1024
-                    return True, f"完成: {output_path.name} ({size_mb:.1f} MB)"
-
-            except asyncio.TimeoutError:
-                return False, f"超时: {episode.title}"
-            except aiohttp.ClientError as e:
-                error_type = type(e).__name__
-                return False, f"网络错误({error_type}): {episode.title}"
-            except (OSError, IOError) as e:
-                return False, f"文件操作失败: {episode.title} - {str(e)}"
-            except Exception as e:
-                # 记录未预期的错误但不崩溃
-                return False, f"未知错误: {episode.title} - {type(e).__name__}"
-            finally:
-                # 确保清理临时文件
-                if temp_path and temp_path.exists():
-                    try:
-                        temp_path.unlink()
-                    except Exception:
-                        pass  # 忽略清理失败
+        try:
+            outcome, _ = await fetch_episode(
+                self, session, episode.audio_url, output_path, skip_existing, podcast_name, episode.guid
+            )
+            if outcome == 'skipped':
+                return True, f"跳过: {output_path.name}"
+            if outcome == 'linked':
+                return True, f"链接: {output_path.name}（内容已在存储中）"
+
+            size_mb = output_path.stat().st_size / 1024 / 1024
+            return True, f"完成: {output_path.name} ({size_mb:.1f} MB)"
+
+        except asyncio.TimeoutError:
+            return False, f"超时: {episode.title}"
+        except aiohttp.ClientError as e:
+            error_type = type(e).__name__
+            return False, f"网络错误({error_type}): {episode.title}"
+        except (OSError, IOError) as e:
+            return False, f"文件操作失败: {episode.title} - {str(e)}"
+        except Exception as e:
+            # 记录未预期的错误但不崩溃
+            return False, f"未知错误: {episode.title} - {type(e).__name__}"
 
     async def download_all(
         self,
         episodes: List[PodcastEpisode],
         podcast_name: str,
         output_dir: Path,
-        skip_existing: bool = False
-    ):
-        """批量下载剧集"""
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for episode in episodes:
-                filename = episode.sanitize_filename(podcast_name)
-                output_path = output_dir / filename
+        skip_existing: bool = False,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> List[bool]:
+        """批量下载剧集（传入 session 时复用已有连接），返回与 episodes 一一对应的成功标志"""
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self.download_all(episodes, podcast_name, output_dir, skip_existing, session)
 
-                task = self.download_episode(session, episode, output_path, skip_existing)
-                tasks.append(task)
-
-            # 使用 tqdm 显示进度
-            results = []
-            with tqdm(total=len(tasks), desc="下载进度", unit="集") as pbar:
-                for coro in asyncio.as_completed(tasks):
-                    result = await coro
-                    results.append(result)
-                    pbar.update(1)
+        output_dir.mkdir(parents=True, exist_ok=True)
 
-                    # 实时显示结果
-                    success, message = result
-                    if success:
-                        tqdm.write(f"[+] {message}")
-                    else:
-                        tqdm.write(f"[-] {message}")
+        tasks = []
+        for episode in episodes:
+            filename = episode.sanitize_filename(podcast_name)
+            output_path = output_dir / filename
+
+            task = self.download_episode(session, episode, output_path, skip_existing, podcast_name)
+            tasks.append(task)
+
+        # 使用 tqdm 显示进度
+        with self.progress, tqdm(total=len(tasks), desc="下载进度", unit="集") as pbar:
+            async def tracked(task) -> bool:
+                success, message = await task
+                pbar.update(1)
+                # 实时显示结果
+                tqdm.write(f"[+] {message}" if success else f"[-] {message}")
+                return success
+
+            results = await asyncio.gather(*(tracked(task) for task in tasks))
+
+        # 统计结果
+        click.echo(f"\nDownload complete: {sum(results)}/{len(results)} succeeded")
+        return results
+
+
+async def download_from_url(
+    session: aiohttp.ClientSession,
+    downloader: PodcastDownloader,
+    url: str,
+    output_dir: Path,
+    all: bool = False,
+    latest: int = 1,
+    skip_existing: bool = False,
+    feed_cache: Optional[FeedCache] = None,
+    metadata_cache: Optional[MetadataCache] = None
+) -> bool:
+    """
+    解析一个 RSS / Apple Podcasts 链接并下载选中的剧集
+    元数据、RSS 和音频请求全部复用同一个 session
+    返回: 选中的剧集是否全部下载成功
+    """
+    click.echo(f"[*] Parsing: {url}\n")
+
+    # 判断 URL 类型和提取单集信息
+    rss_url = url
+    episode_title = None
+    is_single_episode = False
+
+    if 'podcasts.apple.com' in url:
+        click.echo("[*] Detected Apple Podcasts URL, extracting info...")
+
+        # 检查是否为单集链接
+        episode_id = ApplePodcastsParser.extract_episode_id(url)
+        if episode_id:
+            is_single_episode = True
+            click.echo(f"[*] Detected episode link")
+
+            # 按单集 ID 直接解析，命中时无需抓取页面和解析 RSS
+            with span('itunes.lookup_episode'):
+                info = await ApplePodcastsParser.lookup_episode(session, url, episode_id, cache=metadata_cache)
+            if info:
+                episode = PodcastEpisode(
+                    title=info['title'],
+                    audio_url=info['audio_url'],
+                    published=info['published'],
+                    guid=info['guid']
+                )
+                click.echo(f"[*] Podcast: {info['podcast_name']}")
+                click.echo(f"[+] Resolved episode by ID: {episode.title}\n")
+                click.echo(f"[*] Preparing to download 1 episode(s)\n")
+                results = await downloader.download_all(
+                    [episode],
+                    info['podcast_name'],
+                    output_dir,
+                    skip_existing,
+                    session=session
+                )
+                return sum(results) == len(results)
+
+            click.echo("[!] Episode ID not found via lookup, falling back to title matching")
+
+        # 性能优化：一次请求同时获取 RSS URL 和标题
+        with span('apple.metadata', url=url):
+            rss_url, episode_title = await ApplePodcastsParser.extract_metadata_async(session, url, cache=metadata_cache)
+
+        if not rss_url:
+            raise ValueError("Failed to extract RSS URL from Apple Podcasts")
+
+        # 播客主页的页面标题是节目名，不能用来匹配单集，否则 --all / --latest 只会得到一集
+        if not is_single_episode:
+            episode_title = None
+
+        if episode_title:
+            click.echo(f"[*] Episode title: {episode_title}")
+
+        click.echo(f"[+] RSS URL: {rss_url}\n")
+
+    # 解析 RSS
+    # 只要最新 N 集或单集匹配时，流式解析读到目标即停止
+    limit = None if all or episode_title else latest
+    with span('rss.fetch', url=rss_url):
+        podcast_name, episodes = await RSSParser.parse_async(
+            session, rss_url, episode_title=episode_title, cache=feed_cache, limit=limit
+        )
+
+    if not episodes:
+        raise ValueError("No episodes found")
+
+    # 如果是单集链接且找到了匹配的剧集
+    if is_single_episode and len(episodes) == 1:
+        click.echo(f"[*] Podcast: {podcast_name}")
+        click.echo(f"[+] Found matching episode: {episodes[0].title}\n")
+        selected_episodes = episodes
+    else:
+        # 播客链接的正常逻辑
+        if is_single_episode:
+            click.echo(f"[!] Could not match episode ID, will download latest episode\n")
+
+        click.echo(f"[*] Podcast: {podcast_name}")
+        if limit:
+            click.echo(f"[*] Episodes fetched: {len(episodes)} (latest {limit})\n")
+        else:
+            click.echo(f"[*] Total episodes: {len(episodes)}\n")
 
-            # 统计结果
-            success_count = sum(1 for s, _ in results if s)
-            click.echo(f"\nDownload complete: {success_count}/{len(results)} succeeded")
+        # 选择要下载的剧集
+        if all:
+            selected_episodes = episodes
+        else:
+            selected_episodes = episodes[:latest]
+
+    click.echo(f"[*] Preparing to download {len(selected_episodes)} episode(s)\n")
+
+    results = await downloader.download_all(
+        selected_episodes,
+        podcast_name,
+        output_dir,
+        skip_existing,
+        session=session
+    )
+    return bool(results) and sum(results) == len(results)  # 参数 all 遮蔽了内置函数
+
+
+def create_downloader(
+    params: dict,
+    scheduler: Optional[HostScheduler] = None,
+    retry: Optional[RetryPolicy] = None,
+    progress: Optional[ProgressTracker] = None,
+    limiter: Optional[BandwidthLimiter] = None
+) -> PodcastDownloader:
+    """根据命令行参数创建下载器（casts_down 批量模式共用）"""
+    transfer, manifest = create_transfer(params, limiter)
+    feed_cache = metadata_cache = None
+    if not params.get('no_cache'):
+        feed_cache = FeedCache(params.get('cache_dir'))
+        metadata_cache = MetadataCache(params.get('cache_dir'))
+    return PodcastDownloader(
+        concurrent=params.get('concurrent', 3),
+        transfer=transfer,
+        scheduler=scheduler,
+        manifest=manifest,
+        retry=retry or RetryPolicy.from_params(params),
+        progress=progress or ProgressTracker.from_params(params),
+        feed_cache=feed_cache,
+        metadata_cache=metadata_cache
+    )
+
+
+async def prefetch_apple_feeds(
+    session: aiohttp.ClientSession,
+    urls: List[str],
+    cache: Optional[MetadataCache]
+) -> int:
+    """
+    批量模式预取：收集所有 Apple 播客主页链接的播客 ID，批量 lookup 后写入元数据缓存，
+    之后逐个解析这些链接时直接命中缓存。返回解析到 RSS 地址的播客数
+    """
+    if cache is None:
+        return 0
+    podcast_ids = [
+        ApplePodcastsParser.extract_podcast_id(url)
+        for url in urls
+        if 'podcasts.apple.com' in url and not ApplePodcastsParser.extract_episode_id(url)
+    ]
+    podcast_ids = [podcast_id for podcast_id in podcast_ids if podcast_id]
+    if len(podcast_ids) < 2:
+        return 0
+    with span('itunes.lookup_feeds', podcasts=len(podcast_ids)):
+        feeds = await ApplePodcastsParser.lookup_feed_urls(session, podcast_ids, cache)
+    return len(feeds)
+
+
+async def run_url(
+    session: aiohttp.ClientSession,
+    downloader: PodcastDownloader,
+    url: str,
+    params: dict
+) -> bool:
+    """
+    按命令行参数下载一个 RSS / Apple Podcasts 链接
+    params 为命令行参数字典
+    """
+    return await download_from_url(
+        session,
+        downloader,
+        url,
+        Path(params.get('output', './podcasts')),
+        all=params.get('all', False),
+        latest=params.get('latest', 1),
+        skip_existing=params.get('skip_existing', False),
+        feed_cache=downloader.feed_cache,
+        metadata_cache=downloader.metadata_cache
+    )
 
 
 def print_banner():
@@ -404,7 +1030,17 @@ def print_disclaimer():
 @click.option('--output', '-o', type=click.Path(), default='./podcasts', help='输出目录')
 @click.option('--concurrent', '-c', type=int, default=3, help='并发下载数（默认 3）')
 @click.option('--skip-existing', '-s', is_flag=True, help='跳过已存在的文件')
-def main(url: str, all: bool, latest: int, output: str, concurrent: int, skip_existing: bool):
+@transfer_options
+@retry_options
+@ratelimit_options
+@profile_options
+@connection_options
+def main(url: str, all: bool, latest: int, output: str, concurrent: int, skip_existing: bool,
+         segments: int, min_segment_size: float, chunk_size: int, write_buffer: int, progress_fd: Optional[int],
+         cache_dir: Optional[str], no_cache: bool,
+         manifest: Optional[str], no_manifest: bool, store: Optional[str], retries: int, retry_budget: int,
+         limit_rate: Optional[int], limit_rate_per_file: Optional[int], limit_schedule: Optional[list],
+         profile: bool, profile_stats: Optional[str], profile_trace: Optional[str], **net_options):
     """
     播客下载工具
 
@@ -431,77 +1067,23 @@ def main(url: str, all: bool, latest: int, output: str, concurrent: int, skip_ex
         # print_banner()
         # print_disclaimer()
 
-        click.echo(f"[*] Parsing: {url}\n")
+        params = click.get_current_context().params
+        downloader = create_downloader(params)
+        connection = ConnectionConfig.from_params(params)
 
-        # 判断 URL 类型和提取单集信息
-        rss_url = url
-        episode_title = None
-        is_single_episode = False
-
-        if 'podcasts.apple.com' in url:
-            click.echo("[*] Detected Apple Podcasts URL, extracting info...")
-
-            # 检查是否为单集链接
-            episode_id = ApplePodcastsParser.extract_episode_id(url)
-            if episode_id:
-                is_single_episode = True
-                click.echo(f"[*] Detected episode link")
-
-            # 性能优化：一次请求同时获取 RSS URL 和标题
-            async def fetch_metadata():
-                async with aiohttp.ClientSession() as session:
-                    return await ApplePodcastsParser.extract_metadata_async(session, url)
-
-            rss_url, episode_title = asyncio.run(fetch_metadata())
+        # 整个流程在同一个事件循环和同一个 session 中完成
+        async def run():
+            async with connection.create_session() as session:
+                return await run_url(session, downloader, url, params)
 
-            if not rss_url:
-                click.echo("[!] Failed to extract RSS URL from Apple Podcasts", err=True)
-                sys.exit(1)
-
-            if episode_title:
-                click.echo(f"[*] Episode title: {episode_title}")
-
-            click.echo(f"[+] RSS URL: {rss_url}\n")
-
-        # 解析 RSS
-        podcast_name, episodes = RSSParser.parse(rss_url, episode_title=episode_title)
-
-        if not episodes:
-            click.echo("[!] No episodes found", err=True)
+        try:
+            with profiling(params):
+                ok = asyncio.run(run())
+        finally:
+            downloader.close()
+        if not ok:
             sys.exit(1)
 
-        # 如果是单集链接且找到了匹配的剧集
-        if is_single_episode and len(episodes) == 1:
-            click.echo(f"[*] Podcast: {podcast_name}")
-            click.echo(f"[+] Found matching episode: {episodes[0].title}\n")
-            selected_episodes = episodes
-        else:
-            # 播客链接的正常逻辑
-            if is_single_episode:
-                click.echo(f"[!] Could not match episode ID, will download latest episode\n")
-
-            click.echo(f"[*] Podcast: {podcast_name}")
-            click.echo(f"[*] Total episodes: {len(episodes)}\n")
-
-            # 选择要下载的剧集
-            if all:
-                selected_episodes = episodes
-            else:
-                selected_episodes = episodes[:latest]
-
-        click.echo(f"[*] Preparing to download {len(selected_episodes)} episode(s)\n")
-
-        # 下载
-        output_dir = Path(output)
-        downloader = PodcastDownloader(concurrent=concurrent)
-
-        asyncio.run(downloader.download_all(
-            selected_episodes,
-            podcast_name,
-            output_dir,
-            skip_existing
-        ))
-
     except ValueError as e:
         click.echo(f"[!] Error: {str(e)}", err=True)
         sys.exit(1)
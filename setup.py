@@ -1,25 +1,4 @@
 from setuptools import setup
 
-setup(
-    name='podcast-dl',
-    version='1.0.0',
-    py_modules=['podcast_dl'],
-    install_requires=[
-        'aiohttp>=3.8.0',
-        'beautifulsoup4>=4.11.0',
-        'click>=8.1.0',
-        'feedparser>=6.0.10',
-        'requests>=2.28.0',
-        'tqdm>=4.65.0',
-    ],
-    entry_points={
-        'console_scripts': [
-            'podcast-dl=podcast_dl:main',
-        ],
-    },
-    python_requires='>=3.8',
-    author='Podcast Downloader',
-    description='A CLI tool to download podcasts from RSS feeds',
-    long_description=open('README.md').read() if __name__ == '__main__' else '',
-    long_description_content_type='text/markdown',
-)
+# 项目元数据、依赖和模块列表都在 pyproject.toml 中，保留本文件只为兼容 python setup.py 的旧用法
+setup()
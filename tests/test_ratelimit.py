@@ -0,0 +1,91 @@
+"""限速参数解析和按时段切换的全局速率"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from casts_ratelimit import BandwidthLimiter, parse_rate, parse_schedule  # noqa: E402
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('0', 0),
+    ('1000', 1000),
+    ('500K', 500 * 1024),
+    ('500k', 500 * 1024),
+    ('2M', 2 * 1024 ** 2),
+    ('1.5M', int(1.5 * 1024 ** 2)),
+    ('1G', 1024 ** 3),
+    ('2MB', 2 * 1024 ** 2),
+    ('2MiB', 2 * 1024 ** 2),
+    ('2MB/s', 2 * 1024 ** 2),
+    (' 4 M ', 4 * 1024 ** 2),
+])
+def test_parse_rate(value, expected):
+    assert parse_rate(value) == expected
+
+
+@pytest.mark.parametrize('value', ['', 'fast', '-1M', '2T', '1.M', 'M'])
+def test_parse_rate_rejects(value):
+    with pytest.raises(ValueError):
+        parse_rate(value)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('09:00-18:00=1M', [(540, 1080, 1024 ** 2)]),
+    ('09:00-18:00=1M,18:00-23:00=4M', [(540, 1080, 1024 ** 2), (1080, 1380, 4 * 1024 ** 2)]),
+    ('19:00-08:00=0', [(1140, 480, 0)]),
+    ('23:00-24:00=500K', [(1380, 1440, 500 * 1024)]),
+    ('0:00-6:30=2M,', [(0, 390, 2 * 1024 ** 2)]),
+    (' 09:00 - 18:00 = 1M ', [(540, 1080, 1024 ** 2)]),
+])
+def test_parse_schedule(value, expected):
+    assert parse_schedule(value) == expected
+
+
+@pytest.mark.parametrize('value', [
+    '09:00-18:00',          # 缺少速率
+    '9-18=1M',              # 缺少分钟
+    '09:60-18:00=1M',       # 分钟超出范围
+    '09:00-18:75=1M',
+    '24:30-08:00=1M',       # 超过 24:00
+    '25:00-08:00=1M',
+    '09:00-18:00=fast',     # 无效速率
+])
+def test_parse_schedule_rejects(value):
+    with pytest.raises(ValueError):
+        parse_schedule(value)
+
+
+SCHEDULE = '09:00-18:00=1M,19:00-08:00=4M'
+
+
+@pytest.mark.parametrize('clock, expected', [
+    ('09:00', 1024 ** 2),       # 时段起点包含在内
+    ('17:59', 1024 ** 2),
+    ('18:00', 100),             # 时段终点不包含，使用 --limit-rate
+    ('18:59', 100),
+    ('19:00', 4 * 1024 ** 2),   # 跨过午夜的时段
+    ('23:59', 4 * 1024 ** 2),
+    ('00:00', 4 * 1024 ** 2),
+    ('07:59', 4 * 1024 ** 2),
+    ('08:00', 100),
+])
+def test_current_rate_follows_schedule(clock, expected):
+    limiter = BandwidthLimiter(rate=100, schedule=parse_schedule(SCHEDULE))
+    hour, minute = map(int, clock.split(':'))
+    assert limiter.current_rate(datetime(2024, 1, 1, hour, minute)) == expected
+
+
+def test_current_rate_until_midnight():
+    limiter = BandwidthLimiter(rate=0, schedule=parse_schedule('23:00-24:00=1M'))
+    assert limiter.current_rate(datetime(2024, 1, 1, 23, 59)) == 1024 ** 2
+    assert limiter.current_rate(datetime(2024, 1, 1, 0, 0)) == 0
+
+
+def test_from_params_without_limits():
+    assert BandwidthLimiter.from_params({}) is None
+    assert BandwidthLimiter.from_params({'limit_rate': 1024}).current_rate() == 1024
@@ -0,0 +1,143 @@
+"""流式 RSS 解析与 feedparser 解析的一致性"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from podcast_dl import RSSParser, RSSStreamParser  # noqa: E402
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">
+  <channel>
+    <title>Test Show</title>
+    <itunes:title>iTunes Show Title</itunes:title>
+    <item>
+      <title>Episode 3: Latest</title>
+      <itunes:title>Latest</itunes:title>
+      <guid isPermaLink="false">ep-3</guid>
+      <pubDate>Wed, 03 Jan 2024 08:00:00 +0000</pubDate>
+      <enclosure url="https://cdn.example.com/ep3.mp3" type="audio/mpeg" length="100"/>
+    </item>
+    <item>
+      <title>Video only</title>
+      <guid>ep-video</guid>
+      <enclosure url="https://cdn.example.com/video.mp4" type="video/mp4" length="100"/>
+    </item>
+    <item>
+      <title>Episode 2 &amp; Friends</title>
+      <guid>https://example.com/ep-2</guid>
+      <pubDate>Tue, 02 Jan 2024 08:00:00 +0000</pubDate>
+      <enclosure url="https://cdn.example.com/ep2.m4a" type="audio/x-m4a" length="100"/>
+    </item>
+    <item>
+      <title>Episode 1</title>
+      <pubDate>Mon, 01 Jan 2024 08:00:00 +0000</pubDate>
+      <enclosure url="https://cdn.example.com/ep1.mp3" type="audio/mpeg" length="100"/>
+    </item>
+  </channel>
+</rss>
+"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Atom Show</title>
+  <id>urn:uuid:show</id>
+  <entry>
+    <title>Atom Episode 2</title>
+    <id>urn:uuid:ep-2</id>
+    <published>2024-01-02T08:00:00Z</published>
+    <link rel="alternate" href="https://example.com/ep-2"/>
+    <link rel="enclosure" type="audio/mpeg" href="https://cdn.example.com/atom2.mp3"/>
+  </entry>
+  <entry>
+    <title>Atom Episode 1</title>
+    <id>urn:uuid:ep-1</id>
+    <published>2024-01-01T08:00:00Z</published>
+    <link rel="enclosure" type="audio/mpeg" href="https://cdn.example.com/atom1.mp3"/>
+  </entry>
+</feed>
+"""
+
+# 未声明的 HTML 实体不是合法 XML，流式解析失败后应回退到 feedparser
+HTML_ENTITY_RSS = RSS.replace(b'Episode 1</title>', b'Episode&nbsp;1</title>')
+
+
+def as_tuples(episodes) -> list:
+    return [(ep.title, ep.audio_url, ep.published, ep.guid) for ep in episodes]
+
+
+def stream_parse(document: bytes, chunk_size: int = 64, **kwargs) -> RSSStreamParser:
+    """按小块输入文档，找到所需剧集即停止"""
+    parser = RSSStreamParser(**kwargs)
+    for offset in range(0, len(document), chunk_size):
+        if parser.feed(document[offset:offset + chunk_size]):
+            return parser
+    parser.close()
+    return parser
+
+
+def test_stream_matches_feedparser_rss():
+    podcast_name, episodes = RSSParser.parse_document(RSS)
+    parser = stream_parse(RSS)
+    assert parser.complete
+    assert parser.podcast_name == podcast_name == 'Test Show'
+    assert as_tuples(parser.episodes) == as_tuples(episodes)
+    assert [ep.guid for ep in episodes] == ['ep-3', 'https://example.com/ep-2', '']
+
+
+def test_stream_matches_feedparser_atom():
+    podcast_name, episodes = RSSParser.parse_document(ATOM)
+    parser = stream_parse(ATOM)
+    assert parser.podcast_name == podcast_name == 'Atom Show'
+    assert as_tuples(parser.episodes) == as_tuples(episodes)
+    assert len(episodes) == 2
+
+
+def test_stream_stops_at_limit():
+    parser = stream_parse(RSS, chunk_size=16, limit=2)
+    _, episodes = RSSParser.parse_document(RSS)
+    assert not parser.complete
+    assert as_tuples(parser.episodes) == as_tuples(episodes[:2])
+
+
+def test_stream_stops_at_title():
+    parser = stream_parse(RSS, chunk_size=16, episode_title='Test Show: Episode 2 & Friends')
+    assert not parser.complete
+    assert [ep.guid for ep in parser.episodes] == ['https://example.com/ep-2']
+
+
+async def parse_served(document: bytes, **kwargs) -> tuple:
+    app = web.Application()
+
+    async def feed(request: web.Request) -> web.Response:
+        return web.Response(body=document, content_type='application/rss+xml')
+
+    app.router.add_get('/feed.xml', feed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            return await RSSParser.parse_async(session, f'http://127.0.0.1:{port}/feed.xml', **kwargs)
+    finally:
+        await runner.cleanup()
+
+
+def test_parse_async_streams_with_limit():
+    podcast_name, episodes = asyncio.run(parse_served(RSS, limit=1))
+    assert podcast_name == 'Test Show'
+    assert as_tuples(episodes) == as_tuples(RSSParser.parse_document(RSS)[1][:1])
+
+
+def test_parse_async_falls_back_to_feedparser():
+    podcast_name, episodes = asyncio.run(parse_served(HTML_ENTITY_RSS, limit=5))
+    assert podcast_name == 'Test Show'
+    assert [ep.guid for ep in episodes] == ['ep-3', 'https://example.com/ep-2', '']
+    assert episodes[-1].title == 'Episode\xa01'
@@ -0,0 +1,244 @@
+"""TransferEngine 的断点续传、分段下载回退、顺序写入、内容存储的复用校验和重定向后的并发额度"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from casts_progress import ProgressTracker  # noqa: E402
+from casts_scheduler import HostScheduler  # noqa: E402
+from casts_store import ContentStore  # noqa: E402
+from casts_transfer import DiskWriter, PartialDownload, TransferEngine  # noqa: E402
+
+DATA = os.urandom(3 * 1024 * 1024)
+
+
+async def audio_without_validators(request: web.Request) -> web.StreamResponse:
+    """支持 Range 但不返回 ETag / Last-Modified 的音频服务器"""
+    headers = {'Accept-Ranges': 'bytes'}
+    if request.method == 'HEAD':
+        return web.Response(headers={**headers, 'Content-Length': str(len(DATA))})
+    start, end = 0, len(DATA) - 1
+    status = 200
+    if request.headers.get('Range'):
+        first, last = request.headers['Range'].split('=')[1].split('-')
+        start, end = int(first), int(last) if last else end
+        headers['Content-Range'] = f'bytes {start}-{end}/{len(DATA)}'
+        status = 206
+    return web.Response(status=status, body=DATA[start:end + 1], headers=headers)
+
+
+async def download(tmp_path: Path, progress: bool) -> Path:
+    app = web.Application()
+    app.router.add_route('*', '/a.mp3', audio_without_validators)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        engine = TransferEngine(segments=4, min_segment_size=256 * 1024)
+        output = tmp_path / 'a.mp3'
+        transfer = ProgressTracker().transfer(output.name) if progress else None
+        async with aiohttp.ClientSession() as session:
+            size = await engine.fetch(session, f'http://127.0.0.1:{port}/a.mp3', output, transfer)
+        assert size == len(DATA)
+        return output
+    finally:
+        await runner.cleanup()
+
+
+def test_segmented_falls_back_without_validators(tmp_path):
+    output = asyncio.run(download(tmp_path, progress=False))
+    assert output.read_bytes() == DATA
+    assert not list(tmp_path.glob('*.tmp*'))
+
+
+def test_segmented_falls_back_without_validators_with_progress(tmp_path):
+    output = asyncio.run(download(tmp_path, progress=True))
+    assert output.read_bytes() == DATA
+
+
+async def reuse_with(tmp_path: Path, headers: dict, changed: dict) -> list:
+    """先下载一次收录进存储，再按 headers / changed 两种响应各调用一次 reuse"""
+    served = {'headers': headers}
+
+    async def audio(request: web.Request) -> web.Response:
+        if request.method == 'HEAD':
+            return web.Response(headers={**served['headers'], 'Content-Length': str(len(DATA))})
+        return web.Response(body=DATA, headers=served['headers'])
+
+    app = web.Application()
+    app.router.add_route('*', '/a.mp3', audio)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f'http://127.0.0.1:{port}/a.mp3'
+    store = ContentStore(tmp_path / 'store')
+    try:
+        engine = TransferEngine(store=store)
+        async with aiohttp.ClientSession() as session:
+            await engine.fetch(session, url, tmp_path / 'a.mp3')
+            sizes = [await engine.reuse(session, url, tmp_path / 'b.mp3')]
+            served['headers'] = changed
+            sizes.append(await engine.reuse(session, url, tmp_path / 'c.mp3'))
+        return sizes
+    finally:
+        store.close()
+        await runner.cleanup()
+
+
+def test_reuse_validates_with_last_modified(tmp_path):
+    old = {'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    new = {'Last-Modified': 'Tue, 02 Jan 2024 00:00:00 GMT'}
+    assert asyncio.run(reuse_with(tmp_path, old, new)) == [len(DATA), None]
+    assert (tmp_path / 'b.mp3').read_bytes() == DATA
+    assert not (tmp_path / 'c.mp3').exists()
+
+
+def test_reuse_skipped_without_validators(tmp_path):
+    assert asyncio.run(reuse_with(tmp_path, {}, {})) == [None, None]
+    assert not (tmp_path / 'b.mp3').exists()
+
+
+async def fetch_redirected(tmp_path: Path) -> tuple:
+    """127.0.0.1 上的地址 302 跳转到 localhost，下载后返回 (slot, scheduler)"""
+    app = web.Application()
+
+    async def redirect(request: web.Request) -> web.Response:
+        raise web.HTTPFound(f'http://localhost:{request.url.port}/a.mp3')
+
+    app.router.add_route('*', '/r', redirect)
+    app.router.add_route('*', '/a.mp3', audio_without_validators)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, 'localhost', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        scheduler = HostScheduler(2)
+        async with aiohttp.ClientSession() as session:
+            async with scheduler.slot(f'http://127.0.0.1:{port}/r') as slot:
+                await TransferEngine().fetch(session, f'http://127.0.0.1:{port}/r', tmp_path / 'a.mp3', slot=slot)
+                active = {host: state.active for host, state in scheduler._hosts.items()}
+        return slot.host, active, port
+    finally:
+        await runner.cleanup()
+
+
+def test_slot_follows_redirect_to_final_host(tmp_path):
+    host, active, port = asyncio.run(fetch_redirected(tmp_path))
+    assert host == f'localhost:{port}'
+    assert active == {f'127.0.0.1:{port}': 0, f'localhost:{port}': 1}
+
+
+class RecordingWriter(DiskWriter):
+    """记录同时进行的写入数和写入顺序的 DiskWriter"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = self.max_active = 0
+        self.positions = []
+        self._count_lock = threading.Lock()
+
+    def _write_at(self, f, data: bytes, position: int):
+        with self._count_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.positions.append(position)
+        time.sleep(0.002)
+        super()._write_at(f, data, position)
+        with self._count_lock:
+            self.active -= 1
+
+
+def test_file_sink_keeps_one_write_in_flight(tmp_path):
+    # 写入乱序完成时，强制终止后 .tmp 末尾以下可能有未写入的空洞
+    writer = RecordingWriter(buffer_size=64 * 1024, workers=8)
+    path = tmp_path / 'a.tmp'
+
+    async def write():
+        with open(path, 'wb', buffering=0) as f:
+            sink = writer.sink(f, 0)
+            for offset in range(0, len(DATA), 16 * 1024):
+                await sink.write(DATA[offset:offset + 16 * 1024])
+            return await sink.close()
+
+    assert asyncio.run(write()) == len(DATA)
+    assert path.read_bytes() == DATA
+    assert writer.max_active == 1
+    assert writer.positions == sorted(writer.positions)
+
+
+ETAG = '"v1"'
+
+
+async def resume(tmp_path: Path, have: int, mode: str) -> list:
+    """
+    .tmp 中已有前 have 字节时续传，返回服务器收到的 Range 头列表
+    mode: 'range' 按 Range 返回 206，'ignore' 忽略 If-Range 返回 200 全文，
+    'mismatch' 返回起点错误的 206；超出文件末尾的 Range 返回 416
+    """
+    ranges = []
+
+    async def audio(request: web.Request) -> web.Response:
+        headers = {'ETag': ETAG, 'Accept-Ranges': 'bytes'}
+        requested = request.headers.get('Range')
+        ranges.append(requested)
+        if not requested or mode == 'ignore':
+            return web.Response(body=DATA, headers=headers)
+        start = int(requested.split('=')[1].split('-')[0])
+        if start >= len(DATA):
+            return web.Response(status=416, headers={'Content-Range': f'bytes */{len(DATA)}'})
+        if mode == 'mismatch':
+            start = max(0, start - 1024)
+        headers['Content-Range'] = f'bytes {start}-{len(DATA) - 1}/{len(DATA)}'
+        return web.Response(status=206, body=DATA[start:], headers=headers)
+
+    app = web.Application()
+    app.router.add_get('/a.mp3', audio)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f'http://127.0.0.1:{port}/a.mp3'
+    output = tmp_path / 'a.mp3'
+
+    partial = PartialDownload(output)
+    partial.temp_path.write_bytes(DATA[:have])
+    partial.url, partial.etag, partial.total_size, partial.downloaded = url, ETAG, len(DATA), have
+    partial.save()
+    try:
+        async with aiohttp.ClientSession() as session:
+            assert await TransferEngine().fetch(session, url, output) == len(DATA)
+        assert output.read_bytes() == DATA
+        assert not partial.temp_path.exists() and not partial.meta_path.exists()
+        return ranges
+    finally:
+        await runner.cleanup()
+
+
+def test_resume_with_matching_content_range(tmp_path):
+    assert asyncio.run(resume(tmp_path, 1024 * 1024, 'range')) == ['bytes=1048576-']
+
+
+def test_resume_restarts_when_server_ignores_if_range(tmp_path):
+    assert asyncio.run(resume(tmp_path, 1024 * 1024, 'ignore')) == ['bytes=1048576-']
+
+
+def test_resume_finishes_complete_partial_on_416(tmp_path):
+    assert asyncio.run(resume(tmp_path, len(DATA), 'range')) == [f'bytes={len(DATA)}-']
+
+
+def test_resume_restarts_on_mismatched_content_range(tmp_path):
+    assert asyncio.run(resume(tmp_path, 1024 * 1024, 'mismatch')) == ['bytes=1048576-', None]
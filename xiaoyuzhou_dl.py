@@ -9,22 +9,68 @@ import json
 import re
 import sys
 from pathlib import Path
+from typing import List, Optional
 
 import aiohttp
 import click
 from tqdm import tqdm
 
+from casts_cache import MetadataCache
+from casts_manifest import DownloadManifest
+from casts_net import ConnectionConfig, connection_options
+from casts_profile import profile_options, profiling, span
+from casts_progress import ProgressTracker
+from casts_ratelimit import BandwidthLimiter, ratelimit_options
+from casts_retry import RetryPolicy, retry_options
+from casts_scheduler import HostScheduler
+from casts_transfer import TransferEngine, create_transfer, fetch_episode, transfer_options
+from casts_urls import read_url_file
+
+
+# buildId 随网站部署变化，缓存一天；失效时数据端点返回 404，会立即重新获取
+BUILD_ID_TTL = 86400
+
+# 流式提取 __NEXT_DATA__ 使用的标记和读取块大小
+NEXT_DATA_MARKER = b'id="__NEXT_DATA__"'
+NEXT_DATA_CHUNK_SIZE = 16 * 1024
+PAGE_PROPS_PREFIX = re.compile(r'\s*\{\s*"props"\s*:\s*\{\s*"pageProps"\s*:\s*')
+
 
 class XiaoyuzhouDownloader:
     """小宇宙下载器"""
 
-    def __init__(self, concurrent: int = 3):
+    def __init__(
+        self,
+        concurrent: int = 3,
+        transfer: Optional[TransferEngine] = None,
+        scheduler: Optional[HostScheduler] = None,
+        manifest: Optional[DownloadManifest] = None,
+        retry: Optional[RetryPolicy] = None,
+        progress: Optional[ProgressTracker] = None,
+        cache: Optional[MetadataCache] = None
+    ):
         self.concurrent = concurrent
-        self.semaphore = asyncio.Semaphore(concurrent)
+        # 按主机自适应的并发调度，传入 scheduler 时与其他下载器共享同一个全局上限
+        self.scheduler = scheduler or HostScheduler(concurrent)
+        self.transfer = transfer or TransferEngine()
+        self.manifest = manifest
+        self.retry = retry or RetryPolicy()
+        self.progress = progress or ProgressTracker()
+        # buildId 缓存在整个运行期间共用一个连接，处理多个播客时不重复打开
+        self.cache = cache
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
 
+    def close(self):
+        """关闭下载清单、内容存储和元数据缓存的数据库连接"""
+        if self.manifest:
+            self.manifest.close()
+        if self.transfer.store:
+            self.transfer.store.close()
+        if self.cache:
+            self.cache.close()
+
     def extract_episode_data(self, html: str) -> dict:
         """从页面HTML提取剧集数据"""
         match = re.search(
@@ -34,9 +80,54 @@ class XiaoyuzhouDownloader:
         )
         if not match:
             raise ValueError("无法找到 __NEXT_DATA__ 脚本标签，页面结构可能已更改")
+        return self.parse_page_props(match.group(1))
+
+    @staticmethod
+    async def read_next_data(response: aiohttp.ClientResponse) -> str:
+        """
+        流式读取页面，返回 __NEXT_DATA__ 脚本中的 JSON 文本
+        读到脚本结束标签即停止，不再接收之后的内容；标签之前的 HTML 读过即丢弃
+        """
+        buffer = bytearray()
+        body_start = None   # JSON 文本在 buffer 中的起点
+        pos = 0             # 下一次查找的起点
+        async for chunk in response.content.iter_chunked(NEXT_DATA_CHUNK_SIZE):
+            buffer += chunk
+            if body_start is None:
+                index = buffer.find(NEXT_DATA_MARKER)
+                tag_end = buffer.find(b'>', index) if index >= 0 else -1
+                if tag_end < 0:
+                    # 只保留可能被数据块截断的标签开头
+                    keep_from = index if index >= 0 else max(0, len(buffer) - len(NEXT_DATA_MARKER))
+                    del buffer[:keep_from]
+                    continue
+                del buffer[:tag_end + 1]
+                body_start = pos = 0
+
+            end = buffer.find(b'</script>', pos)
+            if end >= 0:
+                return buffer[body_start:end].decode('utf-8')
+            pos = max(0, len(buffer) - len(b'</script>'))
+
+        raise ValueError("无法找到 __NEXT_DATA__ 脚本标签，页面结构可能已更改")
+
+    @staticmethod
+    def parse_page_props(script: str) -> dict:
+        """
+        从 __NEXT_DATA__ JSON 中取出 props.pageProps
+        JSON 以 {"props":{"pageProps": 开头时只解码该子树，否则退回完整解析
+        """
+        match = PAGE_PROPS_PREFIX.match(script)
+        if match:
+            try:
+                page_props, _ = json.JSONDecoder().raw_decode(script, match.end())
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON 解析失败，页面数据格式异常: {str(e)}")
+            if isinstance(page_props, dict):
+                return page_props
 
         try:
-            data = json.loads(match.group(1))
+            data = json.loads(script)
         except json.JSONDecodeError as e:
             raise ValueError(f"JSON 解析失败，页面数据格式异常: {str(e)}")
 
@@ -54,202 +145,369 @@ class XiaoyuzhouDownloader:
 
     async def get_episode_info(self, session: aiohttp.ClientSession, episode_url: str) -> dict:
         """获取单集信息"""
-        async with session.get(episode_url, headers=self.headers) as response:
-            html = await response.text()
-            page_props = self.extract_episode_data(html)
-
-            episode = page_props.get('episode')
-            if not episode:
-                raise ValueError("无法提取剧集信息")
-
-            return {
-                'eid': episode['eid'],
-                'title': episode['title'],
-                'audio_url': episode['enclosure']['url'],
-                'duration': episode.get('duration', 0),
-                'description': episode.get('description', ''),
-                'pubDate': episode.get('pubDate', ''),
-            }
-
-    async def get_podcast_episodes(self, session: aiohttp.ClientSession, podcast_url: str) -> tuple[str, list]:
+        with span('xiaoyuzhou.episode_page', url=episode_url):
+            async with session.get(episode_url, headers=self.headers) as response:
+                response.raise_for_status()  # 404/429/5xx 交给重试策略，而不是报找不到 __NEXT_DATA__
+                script = await self.read_next_data(response)
+        with span('xiaoyuzhou.next_data', 'parse'):
+            page_props = self.parse_page_props(script)
+
+        episode = page_props.get('episode')
+        if not episode:
+            raise ValueError("无法提取剧集信息")
+
+        return {
+            'eid': episode['eid'],
+            'podcast': (episode.get('podcast') or {}).get('title', ''),
+            'title': episode['title'],
+            'audio_url': episode['enclosure']['url'],
+            'duration': episode.get('duration', 0),
+            'description': episode.get('description', ''),
+            'pubDate': episode.get('pubDate', ''),
+        }
+
+    async def get_podcast_episodes(
+        self,
+        session: aiohttp.ClientSession,
+        podcast_url: str,
+        cache: Optional[MetadataCache] = None,
+        quiet: bool = False
+    ) -> tuple[str, list]:
         """
         获取播客的剧集列表
         注意：目前只能获取前15集，完整列表需要额外逆向
-        """
-        async with session.get(podcast_url, headers=self.headers) as response:
-            html = await response.text()
-
-            # 提取 buildId
-            build_id_match = re.search(r'"buildId":"([^"]+)"', html)
-            if not build_id_match:
-                raise ValueError("无法找到 buildId")
-
-            build_id = build_id_match.group(1)
+        quiet 为 True 时不打印播客信息（订阅监视反复轮询时使用）
 
-            # 提取 podcast ID
-            podcast_id = podcast_url.rstrip('/').split('/')[-1]
-
-            # 请求 Next.js 数据端点
-            data_url = f"https://www.xiaoyuzhoufm.com/_next/data/{build_id}/podcast/{podcast_id}.json"
-
-            async with session.get(data_url, headers=self.headers) as data_response:
-                data = await data_response.json()
-
-                podcast = data['pageProps']['podcast']
-                episodes = podcast.get('episodes', [])
-
-                podcast_name = podcast['title']
-                episode_count = podcast['episodeCount']
-
-                click.echo(f"\n[*] Podcast: {podcast_name}")
-                click.echo(f"[*] Total episodes: {episode_count}")
-                click.echo(f"[!] Currently available: {len(episodes)}/{episode_count}")
-
-                if len(episodes) < episode_count:
-                    click.echo(f"[!] Note: Due to Xiaoyuzhou limitations, only first {len(episodes)} episodes available")
-                    click.echo(f"         Full download requires additional reverse engineering\n")
-
-                return podcast_name, episodes
+        buildId 缓存在 cache 中，命中时直接请求 Next.js 数据端点；
+        数据端点 404（网站重新部署）时才重新抓取播客页面获取新的 buildId
+        """
+        # 提取 podcast ID
+        podcast_id = podcast_url.rstrip('/').split('/')[-1]
+
+        data = None
+        build_id = cache.get('xiaoyuzhou', 'build_id') if cache else None
+        if build_id:
+            with span('xiaoyuzhou.podcast_data', url=podcast_url):
+                data = await self.fetch_next_data(session, build_id, podcast_id)
+            if data is None:
+                cache.delete('xiaoyuzhou', 'build_id')
+
+        if data is None:
+            with span('xiaoyuzhou.podcast_page', url=podcast_url):
+                build_id = await self.fetch_build_id(session, podcast_url)
+            if cache:
+                cache.set('xiaoyuzhou', 'build_id', build_id, ttl=BUILD_ID_TTL)
+            with span('xiaoyuzhou.podcast_data', url=podcast_url):
+                data = await self.fetch_next_data(session, build_id, podcast_id)
+            if data is None:
+                raise ValueError(f"播客数据不存在: {podcast_id}")
+
+        podcast = data['pageProps']['podcast']
+        episodes = podcast.get('episodes', [])
+
+        podcast_name = podcast['title']
+        episode_count = podcast['episodeCount']
+        if quiet:
+            return podcast_name, episodes
+
+        click.echo(f"\n[*] Podcast: {podcast_name}")
+        click.echo(f"[*] Total episodes: {episode_count}")
+        click.echo(f"[!] Currently available: {len(episodes)}/{episode_count}")
+
+        if len(episodes) < episode_count:
+            click.echo(f"[!] Note: Due to Xiaoyuzhou limitations, only first {len(episodes)} episodes available")
+            click.echo(f"         Full download requires additional reverse engineering\n")
+
+        return podcast_name, episodes
+
+    async def fetch_build_id(self, session: aiohttp.ClientSession, page_url: str) -> str:
+        """从页面的 __NEXT_DATA__ 中提取当前部署的 Next.js buildId"""
+        async with session.get(page_url, headers=self.headers) as response:
+            response.raise_for_status()
+            script = await self.read_next_data(response)
+
+        build_id_match = re.search(r'"buildId":"([^"]+)"', script)
+        if not build_id_match:
+            raise ValueError("无法找到 buildId")
+        return build_id_match.group(1)
+
+    async def fetch_next_data(self, session: aiohttp.ClientSession, build_id: str, podcast_id: str) -> Optional[dict]:
+        """
+        请求 Next.js 数据端点
+        返回: JSON 数据；buildId 已失效（404）时返回 None
+        """
+        data_url = f"https://www.xiaoyuzhoufm.com/_next/data/{build_id}/podcast/{podcast_id}.json"
+        async with session.get(data_url, headers=self.headers) as response:
+            if response.status == 404:
+                return None
+            response.raise_for_status()
+            return await response.json(content_type=None)
 
     async def download_audio(
         self,
         session: aiohttp.ClientSession,
         audio_url: str,
         output_path: Path,
-        skip_existing: bool = False
+        skip_existing: bool = False,
+        podcast: str = '',
+        eid: Optional[str] = None
     ) -> tuple[bool, str]:
         """下载单个音频文件（带资源清理和详细错误处理）"""
-        async with self.semaphore:
-            temp_path = None
-            try:
-                if output_path.exists() and skip_existing:
-                    return True, f"Skipped: {output_path.name}"
-
-                async with session.get(audio_url, timeout=aiohttp.ClientTimeout(total=3600)) as response:
-                    response.raise_for_status()
-
-                    temp_path = output_path.with_suffix(output_path.suffix + '.tmp')
-
-                    with open(temp_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-
-                    # 安全重命名
-                    if output_path.exists():
-                        output_path.unlink()
-                    temp_path.rename(output_path)
-                    temp_path = None  # 标记已成功重命名
-
-                    size_mb = output_path.stat().st_size / 1024 / 1024
-                    return True, f"Completed: {output_path.name} ({size_mb:.1f} MB)"
-
-            except asyncio.TimeoutError:
-                return False, f"Timeout: {output_path.name}"
-            except aiohttp.ClientError as e:
-                error_type = type(e).__name__
-                return False, f"Network error({error_type}): {output_path.name}"
-            except (OSError, IOError) as e:
-                return False, f"File error: {output_path.name} - {str(e)}"
-            except Exception as e:
-                return False, f"Unknown error: {output_path.name} - {type(e).__name__}"
-            finally:
-                # 确保清理临时文件
-                if temp_path and temp_path.exists():
-                    try:
-                        temp_path.unlink()
-                    except Exception:
-                        pass
-
-    async def download_episode_by_url(self, episode_url: str, output_dir: Path, skip_existing: bool = False):
-        """下载单个剧集（通过 URL）"""
-        async with aiohttp.ClientSession() as session:
-            click.echo(f"[*] Fetching episode info...")
+        try:
+            outcome, _ = await fetch_episode(self, session, audio_url, output_path, skip_existing, podcast, eid)
+            if outcome == 'skipped':
+                return True, f"Skipped: {output_path.name}"
+            if outcome == 'linked':
+                return True, f"Linked: {output_path.name} (already in store)"
+
+            size_mb = output_path.stat().st_size / 1024 / 1024
+            return True, f"Completed: {output_path.name} ({size_mb:.1f} MB)"
+
+        except asyncio.TimeoutError:
+            return False, f"Timeout: {output_path.name}"
+        except aiohttp.ClientError as e:
+            error_type = type(e).__name__
+            return False, f"Network error({error_type}): {output_path.name}"
+        except (OSError, IOError) as e:
+            return False, f"File error: {output_path.name} - {str(e)}"
+        except Exception as e:
+            return False, f"Unknown error: {output_path.name} - {type(e).__name__}"
+
+    async def download_episode_by_url(
+        self,
+        episode_url: str,
+        output_dir: Path,
+        skip_existing: bool = False,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> bool:
+        """下载单个剧集（通过 URL），返回是否成功"""
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self.download_episode_by_url(episode_url, output_dir, skip_existing, session)
 
-            episode_info = await self.get_episode_info(session, episode_url)
+        click.echo(f"[*] Fetching episode info...")
 
-            click.echo(f"\nTitle: {episode_info['title']}")
-            click.echo(f"Duration: {episode_info['duration']}s")
-            click.echo(f"Audio: {episode_info['audio_url']}\n")
+        episode_info = await self.get_episode_info(session, episode_url)
 
-            output_dir.mkdir(parents=True, exist_ok=True)
+        click.echo(f"\nTitle: {episode_info['title']}")
+        click.echo(f"Duration: {episode_info['duration']}s")
+        click.echo(f"Audio: {episode_info['audio_url']}\n")
 
-            # 清理文件名
-            safe_title = re.sub(r'[<>:"/\\|?*]', '', episode_info['title'])
-            filename = f"{safe_title}.m4a"
-            output_path = output_dir / filename
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = output_dir / self.episode_filename(episode_info)
 
-            click.echo("[*] Starting download...\n")
+        click.echo("[*] Starting download...\n")
 
+        with self.progress:
             success, message = await self.download_audio(
                 session,
                 episode_info['audio_url'],
                 output_path,
-                skip_existing
+                skip_existing,
+                podcast=episode_info['podcast'],
+                eid=episode_info['eid']
             )
 
-            if success:
-                click.echo(f"[+] {message}")
-            else:
-                click.echo(f"[-] {message}", err=True)
-                sys.exit(1)
+        if success:
+            click.echo(f"[+] {message}")
+        else:
+            click.echo(f"[-] {message}", err=True)
+        return success
+
+    async def download_episodes_by_urls(
+        self,
+        episode_urls: List[str],
+        output_dir: Path,
+        skip_existing: bool = False,
+        session: Optional[aiohttp.ClientSession] = None,
+        resolve_concurrent: int = 8
+    ) -> List[bool]:
+        """
+        批量下载多个单集链接
+        单集信息并发解析（上限 resolve_concurrent），每集解析完成后立即开始下载，
+        下载并发由调度器控制，全程共享一个会话
+        返回: 与 episode_urls 一一对应的成功标志
+        """
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self.download_episodes_by_urls(
+                    episode_urls, output_dir, skip_existing, session, resolve_concurrent
+                )
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        resolve_semaphore = asyncio.Semaphore(max(1, resolve_concurrent))
+
+        async def process(episode_url: str) -> tuple[bool, str]:
+            try:
+                async with resolve_semaphore:
+                    episode_info = await self.retry.call(
+                        lambda: self.get_episode_info(session, episode_url), episode_url, notify=tqdm.write
+                    )
+            except (asyncio.TimeoutError, aiohttp.ClientError, ValueError, KeyError) as e:
+                return False, f"Failed to resolve {episode_url}: {str(e) or type(e).__name__}"
+
+            return await self.download_audio(
+                session,
+                episode_info['audio_url'],
+                output_dir / self.episode_filename(episode_info),
+                skip_existing,
+                podcast=episode_info['podcast'],
+                eid=episode_info['eid']
+            )
+
+        with self.progress, tqdm(total=len(episode_urls), desc="Download Progress", unit="ep") as pbar:
+            async def tracked(episode_url: str) -> bool:
+                success, message = await process(episode_url)
+                pbar.update(1)
+                tqdm.write(f"[+] {message}" if success else f"[-] {message}")
+                return success
+
+            results = await asyncio.gather(*(tracked(url) for url in episode_urls))
+
+        click.echo(f"\nDownload complete: {sum(results)}/{len(results)} succeeded")
+        return list(results)
+
+    @staticmethod
+    def episode_filename(episode_info: dict) -> str:
+        """单集链接下载使用的文件名（清理非法字符）"""
+        safe_title = re.sub(r'[<>:"/\\|?*]', '', episode_info['title'])
+        return f"{safe_title}.m4a"
 
     async def download_podcast(
         self,
         podcast_url: str,
         output_dir: Path,
         skip_existing: bool = False,
-        latest: int = None
-    ):
-        """批量下载播客剧集"""
-        async with aiohttp.ClientSession() as session:
-            click.echo(f"[*] Fetching podcast info...")
+        latest: int = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        cache: Optional[MetadataCache] = None
+    ) -> bool:
+        """批量下载播客剧集，返回是否全部成功"""
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self.download_podcast(podcast_url, output_dir, skip_existing, latest, session, cache)
 
-            podcast_name, episodes = await self.get_podcast_episodes(session, podcast_url)
+        click.echo(f"[*] Fetching podcast info...")
 
-            if not episodes:
-                click.echo("[!] No episodes found", err=True)
-                sys.exit(1)
+        podcast_name, episodes = await self.get_podcast_episodes(session, podcast_url, cache)
 
-            # 选择要下载的剧集
-            if latest:
-                episodes = episodes[:latest]
+        if not episodes:
+            raise ValueError("No episodes found")
 
-            click.echo(f"[*] Preparing to download {len(episodes)} episode(s)\n")
+        # 选择要下载的剧集
+        if latest:
+            episodes = episodes[:latest]
 
-            output_dir.mkdir(parents=True, exist_ok=True)
+        click.echo(f"[*] Preparing to download {len(episodes)} episode(s)\n")
 
-            # 批量下载
-            tasks = []
-            for episode in episodes:
-                safe_title = re.sub(r'[<>:"/\\|?*]', '', episode['title'])
-                filename = f"{podcast_name} - {safe_title}.m4a"
-                output_path = output_dir / filename
+        return all(await self.download_episodes(session, podcast_name, episodes, output_dir, skip_existing))
 
-                task = self.download_audio(
-                    session,
-                    episode['enclosure']['url'],
-                    output_path,
-                    skip_existing
-                )
-                tasks.append(task)
+    async def download_episodes(
+        self,
+        session: aiohttp.ClientSession,
+        podcast_name: str,
+        episodes: list,
+        output_dir: Path,
+        skip_existing: bool = False
+    ) -> List[bool]:
+        """下载播客数据中的剧集列表（download_podcast 和订阅监视共用），返回与 episodes 一一对应的成功标志"""
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        # 批量下载
+        tasks = []
+        for episode in episodes:
+            safe_title = re.sub(r'[<>:"/\\|?*]', '', episode['title'])
+            filename = f"{podcast_name} - {safe_title}.m4a"
+            output_path = output_dir / filename
 
-            # 显示进度
-            results = []
-            with tqdm(total=len(tasks), desc="Download Progress", unit="ep") as pbar:
-                for coro in asyncio.as_completed(tasks):
-                    result = await coro
-                    results.append(result)
-                    pbar.update(1)
+            task = self.download_audio(
+                session,
+                episode['enclosure']['url'],
+                output_path,
+                skip_existing,
+                podcast=podcast_name,
+                eid=episode.get('eid')
+            )
+            tasks.append(task)
+
+        # 显示进度
+        with self.progress, tqdm(total=len(tasks), desc="Download Progress", unit="ep") as pbar:
+            async def tracked(task) -> bool:
+                success, message = await task
+                pbar.update(1)
+                tqdm.write(f"[+] {message}" if success else f"[-] {message}")
+                return success
+
+            results = await asyncio.gather(*(tracked(task) for task in tasks))
+
+        # 统计
+        click.echo(f"\nDownload complete: {sum(results)}/{len(results)} succeeded")
+        return results
+
+
+def is_supported_url(url: str) -> bool:
+    """是否为可识别的小宇宙单集或播客链接"""
+    return '/episode/' in url or '/podcast/' in url
+
+
+def create_downloader(
+    params: dict,
+    scheduler: Optional[HostScheduler] = None,
+    retry: Optional[RetryPolicy] = None,
+    progress: Optional[ProgressTracker] = None,
+    limiter: Optional[BandwidthLimiter] = None
+) -> XiaoyuzhouDownloader:
+    """根据命令行参数创建下载器（casts_down 批量模式共用）"""
+    transfer, manifest = create_transfer(params, limiter)
+    return XiaoyuzhouDownloader(
+        concurrent=params.get('concurrent', 3),
+        transfer=transfer,
+        scheduler=scheduler,
+        manifest=manifest,
+        retry=retry or RetryPolicy.from_params(params),
+        progress=progress or ProgressTracker.from_params(params),
+        cache=None if params.get('no_cache') else MetadataCache(params.get('cache_dir'))
+    )
+
+
+async def run_url(
+    session: aiohttp.ClientSession,
+    downloader: XiaoyuzhouDownloader,
+    url: str,
+    params: dict
+) -> bool:
+    """
+    按链接类型下载一个小宇宙链接，返回是否成功
+    params 为命令行参数字典
+    """
+    output_dir = Path(params.get('output', './xiaoyuzhou_downloads'))
+    skip_existing = params.get('skip_existing', False)
+
+    if '/episode/' in url:
+        # 单集下载
+        return await downloader.download_episode_by_url(url, output_dir, skip_existing, session=session)
+    if '/podcast/' in url:
+        # 播客批量下载
+        return await downloader.download_podcast(
+            url, output_dir, skip_existing, params.get('latest'), session=session, cache=downloader.cache
+        )
+    raise ValueError(f"Unrecognized Xiaoyuzhou URL format: {url}")
 
-                    success, message = result
-                    if success:
-                        tqdm.write(f"[+] {message}")
-                    else:
-                        tqdm.write(f"[-] {message}")
 
-            # 统计
-            success_count = sum(1 for s, _ in results if s)
-            click.echo(f"\nDownload complete: {success_count}/{len(results)} succeeded")
+async def run_episode_urls(
+    session: aiohttp.ClientSession,
+    downloader: XiaoyuzhouDownloader,
+    episode_urls: List[str],
+    params: dict
+) -> List[bool]:
+    """批量下载多个小宇宙单集链接，返回每个链接是否成功"""
+    return await downloader.download_episodes_by_urls(
+        episode_urls,
+        Path(params.get('output', './xiaoyuzhou_downloads')),
+        params.get('skip_existing', False),
+        session=session,
+        resolve_concurrent=params.get('resolve_concurrent', 8)
+    )
 
 
 def print_banner():
@@ -290,12 +548,25 @@ def print_disclaimer():
 
 
 @click.command()
-@click.argument('url')
+@click.argument('urls', nargs=-1)
+@click.option('--input-file', '-i', 'input_files', type=click.Path(exists=True, dir_okay=False), multiple=True,
+              help='链接列表文件，每行一个（可重复）')
+@click.option('--resolve-concurrent', type=int, default=8, help='批量单集链接同时解析的数量（默认 8）')
 @click.option('--output', '-o', type=click.Path(), default='./xiaoyuzhou_downloads', help='输出目录')
 @click.option('--concurrent', '-c', type=int, default=3, help='并发下载数')
 @click.option('--skip-existing', '-s', is_flag=True, help='跳过已存在的文件')
 @click.option('--latest', '-l', type=int, help='仅下载最新 N 集（仅播客链接）')
-def main(url: str, output: str, concurrent: int, skip_existing: bool, latest: int):
+@transfer_options
+@retry_options
+@ratelimit_options
+@profile_options
+@connection_options
+def main(urls: tuple, input_files: tuple, resolve_concurrent: int, output: str, concurrent: int,
+         skip_existing: bool, latest: int, segments: int, min_segment_size: float, chunk_size: int,
+         write_buffer: int, progress_fd: Optional[int], cache_dir: Optional[str], no_cache: bool,
+         manifest: Optional[str], no_manifest: bool, store: Optional[str], retries: int, retry_budget: int,
+         limit_rate: Optional[int], limit_rate_per_file: Optional[int], limit_schedule: Optional[list],
+         profile: bool, profile_stats: Optional[str], profile_trace: Optional[str], **net_options):
     """
     小宇宙播客下载器
 
@@ -317,6 +588,10 @@ def main(url: str, output: str, concurrent: int, skip_existing: bool, latest: in
     # 仅下载最新3集
     xiaoyuzhou-dl "https://www.xiaoyuzhoufm.com/podcast/6388760f22567e8ea6ad070f" --latest 3
 
+    \b
+    # 批量下载多个单集链接（并发解析，解析完即开始下载）
+    xiaoyuzhou-dl URL1 URL2 -i episodes.txt
+
     \b
     [!] Limitations:
     Due to Xiaoyuzhou technical limitations, podcast links can only fetch first 15 episodes.
@@ -329,23 +604,55 @@ def main(url: str, output: str, concurrent: int, skip_existing: bool, latest: in
         # 打印横幅和免责声明（已移至 casts_down.py 统一入口）
         # print_banner()
         # print_disclaimer()
-        downloader = XiaoyuzhouDownloader(concurrent=concurrent)
-        output_dir = Path(output)
+
+        urls = list(urls)
+        for path in input_files:
+            urls.extend(read_url_file(path))
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            raise click.UsageError("请提供至少一个链接或 --input-file")
 
         # 判断链接类型
-        if '/episode/' in url:
-            # 单集下载
-            asyncio.run(downloader.download_episode_by_url(url, output_dir, skip_existing))
-        elif '/podcast/' in url:
-            # 播客批量下载
-            asyncio.run(downloader.download_podcast(url, output_dir, skip_existing, latest))
-        else:
-            click.echo("[!] Unrecognized URL format", err=True)
+        unsupported = [url for url in urls if not is_supported_url(url)]
+        if unsupported:
+            click.echo(f"[!] Unrecognized URL format: {unsupported[0]}", err=True)
             click.echo("Supported formats:", err=True)
             click.echo("  - https://www.xiaoyuzhoufm.com/episode/{eid}", err=True)
             click.echo("  - https://www.xiaoyuzhoufm.com/podcast/{pid}", err=True)
             sys.exit(1)
 
+        params = click.get_current_context().params
+        downloader = create_downloader(params)
+        connection = ConnectionConfig.from_params(params)
+
+        async def run():
+            async with connection.create_session() as session:
+                if len(urls) == 1:
+                    return await run_url(session, downloader, urls[0], params)
+
+                # 多个单集链接走并发流水线，播客链接逐个处理
+                episode_urls = [url for url in urls if '/episode/' in url]
+                results = await run_episode_urls(session, downloader, episode_urls, params) if episode_urls else []
+                for url in urls:
+                    if '/episode/' in url:
+                        continue
+                    try:
+                        results.append(await run_url(session, downloader, url, params))
+                    except (ValueError, KeyError, aiohttp.ClientError) as e:
+                        click.echo(f"[-] {url}: {e}", err=True)
+                        results.append(False)
+                return all(results)
+
+        try:
+            with profiling(params):
+                ok = asyncio.run(run())
+        finally:
+            downloader.close()
+        if not ok:
+            sys.exit(1)
+
+    except click.UsageError:
+        raise
     except ValueError as e:
         click.echo(f"[!] Error: {str(e)}", err=True)
         sys.exit(1)